@@ -1,27 +1,36 @@
-import yfinance as yf
 import pandas as pd
 import time
 import os
 import datetime
+import html as _html
 import tqdm
 import random
 import re
 import unicodedata
 import json
-import feedparser
-from urllib.parse import quote
-from deep_translator import GoogleTranslator
 import datetime
-import yfinance as yf
 from scripts.validate_data import validar_dados
-from scripts.scoring import value_score
 from scripts.scoring import calcular_preco_justo
-from scripts.scoring import calcular_desconto
-from scripts.scoring import calcular_risco, farol_risco
-from scripts.scoring import calcular_ranking
+from scripts.scoring import calcular_desconto_vetorizado
+from scripts.scoring import calcular_risco_vetorizado, farol_risco
+from scripts.scoring import calcular_ranking_vetorizado
+from scripts.fatores import aplicar_fatores
+from scripts.regras_score import aplicar_regras, carregar_regras
+from scripts.valuation import MODELOS, MODELO_PADRAO, aplicar_modelo
 from scripts.logger import logger
 from scripts.logo_manager import preparar_logos
-from scripts.collect_data import get_b3_tickers, get_stock_data, filtrar_acoes_validas
+from scripts.logo_optimizer import otimizar_logos, css_logos, html_logo
+from scripts.http_client import registrar_estatisticas as registrar_estatisticas_http
+from scripts.translation_cache import salvar_traducoes
+from scripts.translation_service import EtapaTraducao
+from scripts.translation_cache import registrar_estatisticas as registrar_estatisticas_traducao
+from scripts.info_cache import registrar_estatisticas as registrar_estatisticas_cache_info
+from scripts.issuers import registrar_estatisticas as registrar_estatisticas_emissores
+from scripts.collect_data import get_b3_tickers, get_stock_data, filtrar_acoes_validas, prefiltrar_por_mercado
+from scripts.collect_data import PRAZO_TICKER_S, ORCAMENTO_COLETA_S, LIMITES_POR_HOST
+from scripts.noticias import EtapaNoticias, obter_noticias, obter_noticias_hedge, salvar_validadores
+from scripts.noticias import registrar_estatisticas as registrar_estatisticas_noticias
+from scripts.dividend_store import atualizar_todos as atualizar_dividendos, obter_dividendos, tabela_dividendos
 from scripts.history_manager import salvar_historico
 from scripts.history_analysis import carregar_historico
 
@@ -92,11 +101,29 @@ universo_b3 = len(tickers)
 
 print("Ações filtradas:", universo_b3)
 
+# descarta small caps ilíquidas antes da coleta fundamentalista
+tickers = prefiltrar_por_mercado(tickers)
+
 # =========================
 # COLETA FUNDAMENTALISTA
 # =========================
 
-df = get_stock_data(tickers, traducao_setores, classificar_cap)
+# COLETA_MODO: "threads" (padrão), "async" ou "comparar" (roda os dois e loga o tempo)
+COLETA_MODO = os.environ.get("COLETA_MODO", "threads")
+
+# prazos em segundos; ao estourar o orçamento a coleta segue com o que já tem
+COLETA_PRAZO_TICKER_S = float(os.environ.get("COLETA_PRAZO_TICKER_S", PRAZO_TICKER_S))
+COLETA_ORCAMENTO_S = float(os.environ.get("COLETA_ORCAMENTO_S", ORCAMENTO_COLETA_S))
+
+df = get_stock_data(
+    tickers, traducao_setores, classificar_cap,
+    modo=COLETA_MODO,
+    prazo_ticker=COLETA_PRAZO_TICKER_S,
+    orcamento=COLETA_ORCAMENTO_S,
+)
+
+registrar_estatisticas_cache_info()
+registrar_estatisticas_emissores()
 
 cnpj_empresas = {
     "PETR4": "33.000.167/0001-01",
@@ -177,17 +204,33 @@ if df.empty:
 
 logger.info(f"{len(df)} empresas passaram no filtro de qualidade.")
 
-# Score
-df["Score"] = df.apply(value_score, axis=1)
+# =========================
+# TRADUÇÃO (SEGUNDO PLANO)
+# =========================
+
+# resumos são traduzidos numa thread própria enquanto score e logos seguem;
+# o que não ficar pronto no prazo vai para a página no original
+TRADUCAO_PRAZO_S = float(os.environ.get("TRADUCAO_PRAZO_S", 120))
+TRADUCAO_PRAZO_NOTICIAS_S = float(os.environ.get("TRADUCAO_PRAZO_NOTICIAS_S", 10))
+
+etapa_traducao = EtapaTraducao(paralelo=LIMITES_POR_HOST["tradutor"])
+etapa_traducao.agendar(df["Resumo"].dropna().tolist())
+
+# Score: "regras" (faixas de value_score) ou "fatores" (percentis e z-scores por setor)
+SCORE_MODO = os.environ.get("SCORE_MODO", "regras")
+
+df = aplicar_fatores(df, SCORE_MODO)
+
+# Preço justo: todos os modelos viram colunas; VALUATION_MODELO escolhe o PrecoJusto
+VALUATION_MODELO = os.environ.get("VALUATION_MODELO", MODELO_PADRAO)
 
-# Preço justo
-df["LucroPorAcao"] = df["Preco"] / df["PL"]
-df["PrecoJusto"] = df["LucroPorAcao"] * 15
+df = aplicar_modelo(df, VALUATION_MODELO)
+DESCRICAO_MODELO = MODELOS[VALUATION_MODELO]["descricao"]
 
 # Desconto %
-df["Desconto_%"] = df.apply(calcular_desconto, axis=1)
+df["Desconto_%"] = calcular_desconto_vetorizado(df)
 
-df["Ranking"] = df.apply(calcular_ranking, axis=1)
+df["Ranking"] = calcular_ranking_vetorizado(df)
 
 historico = carregar_historico(365)
 
@@ -195,7 +238,15 @@ top_n = 9999
 df = df.nlargest(top_n, "Desconto_%")
 
 # Risco
-df["Risco"] = df.apply(calcular_risco, axis=1)
+df["Risco"] = calcular_risco_vetorizado(df)
+
+# SCORE_REGRAS=data/regras_score.json: as saídas do arquivo (Score, Ranking,
+# Risco...) substituem as das funções; teste antes com python -m scripts.regras_score
+SCORE_REGRAS = os.environ.get("SCORE_REGRAS")
+
+if SCORE_REGRAS:
+    df = aplicar_regras(df, carregar_regras(SCORE_REGRAS))
+
 df["Risco_num"] = pd.to_numeric(df["Risco"], errors="coerce")
 df["Farol"] = df["Risco"].apply(farol_risco)
 
@@ -208,6 +259,30 @@ def garantir_colunas(df):
     return df
 
 
+# =========================
+# NOTÍCIAS (SEGUNDO PLANO)
+# =========================
+
+# busca as notícias de todos os tickers em paralelo enquanto o resto segue;
+# a geração das páginas só lê o que ficou pronto, sem esperar a rede
+NOTICIAS_PRAZO_S = float(os.environ.get("NOTICIAS_PRAZO_S", 180))
+
+# "hedge": Yahoo disparado se o Google demorar; "sequencial": Yahoo só após Google vazio
+NOTICIAS_MODO = os.environ.get("NOTICIAS_MODO", "hedge")
+
+etapa_noticias = EtapaNoticias(
+    buscar=obter_noticias_hedge if NOTICIAS_MODO == "hedge" else obter_noticias,
+    max_workers=LIMITES_POR_HOST["yahoo"],
+    traduzir=lambda textos: etapa_traducao.traduzir(textos, prazo=TRADUCAO_PRAZO_NOTICIAS_S)
+)
+etapa_noticias.agendar(zip(df["Ticker"], df["Empresa"].apply(limpar_nome_empresa)))
+
+preparar_logos(df)
+otimizar_logos(df["Ticker"])
+
+traducoes_resumo = etapa_traducao.aguardar(prazo=TRADUCAO_PRAZO_S)
+df["Resumo"] = df["Resumo"].map(lambda r: traducoes_resumo.get(r, r))
+
 salvar_historico(df)
 
 historico = carregar_historico(365)
@@ -222,7 +297,6 @@ if not historico.empty:
 else:
     df["Variacao_%"] = 0
 
-preparar_logos(df)
 df = garantir_colunas(df)
 df["Empresa"] = df["Empresa"].apply(limpar_nome_empresa)
 
@@ -800,9 +874,8 @@ def gerar_texto_seo(row):
 def obter_proventos(ticker, limite=6):
     """Retorna últimos proventos pagos (data, tipo, valor)."""
     try:
-        t = yf.Ticker(f"{ticker}.SA")
-        div = t.dividends
-        if div is None or div.empty:
+        div = obter_dividendos(ticker)
+        if div.empty:
             return []
         div = div.sort_index(ascending=False).head(limite)
         return [
@@ -816,147 +889,24 @@ def obter_proventos(ticker, limite=6):
     except Exception:
         return []
 
-# =========================
-# NOTÍCIAS (PT-BR + FALLBACK)
-# =========================
-
-
-
-translator = GoogleTranslator(source='auto', target='pt')
-
-
-def traduzir(texto):
-    try:
-        if not texto:
-            return texto
-        return translator.translate(texto)
-    except Exception:
-        return texto
-
-
-def obter_noticias_google(ticker, empresa, limite=4):
-    """Busca notícias em português via Google News RSS"""
-    try:
-        query = quote(f"{empresa} {ticker}")
-        url = f"https://news.google.com/rss/search?q={query}&hl=pt-BR&gl=BR&ceid=BR:pt-419"
-
-        feed = feedparser.parse(url)
-
-        noticias = []
-        for entry in feed.entries[:limite]:
-            noticias.append({
-                "titulo": entry.title,
-                "resumo": entry.summary if hasattr(entry, "summary") else "",
-                "link": entry.link,
-                "fonte": entry.source.title if hasattr(entry, "source") else "Google News",
-                "data": entry.published[:10] if hasattr(entry, "published") else ""
-            })
-
-        return noticias
-
-    except Exception:
-        return []
-
-
-def obter_noticias_yahoo(ticker, limite=4):
-    """Fallback usando Yahoo Finance + tradução"""
-    try:
-        t = yf.Ticker(f"{ticker}.SA")
-        noticias = t.news or []
-        resultado = []
-
-        for n in noticias[:limite]:
-            content = n.get("content", n)
-
-            titulo = content.get("title") or ""
-            resumo = (
-                content.get("summary")
-                or content.get("description")
-                or ""
-            )
-
-            link = (
-                (content.get("canonicalUrl") or {}).get("url")
-                or n.get("link")
-                or "#"
-            )
-
-            ts = content.get("pubDate") or n.get("providerPublishTime")
-
-            try:
-                if isinstance(ts, (int, float)):
-                    data_pub = datetime.datetime.fromtimestamp(ts).strftime("%d/%m/%Y")
-                else:
-                    data_pub = ""
-            except Exception:
-                data_pub = ""
-
-            if titulo and link:
-                resultado.append({
-                    "titulo": traduzir(titulo),
-                    "resumo": traduzir(resumo),
-                    "link": link,
-                    "fonte": "Yahoo Finance",
-                    "data": data_pub,
-                })
-
-        return resultado
-
-    except Exception:
-        return []
-
-
-def obter_noticias(ticker, empresa, limite=4):
-    """Prioriza português → fallback traduzido"""
-
-    # 1️⃣ Google News (PT-BR)
-    noticias = obter_noticias_google(ticker, empresa, limite)
-
-    if noticias:
-        return noticias
-
-    # 2️⃣ Fallback Yahoo
-    return obter_noticias_yahoo(ticker, limite)
-
-
 # =========================
 # RENDER HTML
 # =========================
 
-def render_noticias_html(noticias, ticker):
-    if not noticias:
-        return f"""
-<section class="card" style="margin-top:24px;">
-  <h2>📰 Principais notícias sobre {ticker}</h2>
-  <p>Nenhuma notícia recente encontrada.</p>
-</section>
-"""
+def render_modelos_html(row):
+    """Preço justo de cada modelo, para comparar com o usado no site."""
 
-    itens = ""
-    for n in noticias:
-        meta = " • ".join(filter(None, [n["fonte"], n["data"]]))
+    # só a primeira letra: capitalize() rebaixaria "P/L" e "ROE"
+    itens = "".join(
+        f"<li>{m['descricao'][:1].upper() + m['descricao'][1:]}: <strong>R$ {round(row[m['coluna']], 2)}</strong></li>"
+        for m in MODELOS.values()
+        if row.get(m["coluna"], 0) > 0
+    )
 
-        itens += f"""
-<article style="padding:16px 0;border-bottom:1px solid #2a2a2a;">
-  <h3 style="margin:0 0 6px 0;">{n['titulo']}</h3>
-  <p style="font-size:12px;opacity:.7;margin:0 0 8px 0;">{meta}</p>
-  <p style="margin:0 0 10px 0;">{n['resumo']}</p>
-  <a href="{n['link']}" target="_blank" rel="noopener noreferrer"
-     style="font-size:13px;text-decoration:underline;">
-    Ler matéria original ↗
-  </a>
-</article>
-"""
+    if not itens:
+        return ""
 
-    return f"""
-<section class="card" style="margin-top:24px;">
-  <h2>📰 Principais notícias sobre {ticker}</h2>
-  {itens}
-  <p style="font-size:12px;opacity:.6;margin-top:12px;">
-    Conteúdo exibido para fins informativos. Direitos reservados às fontes originais.
-  </p>
-</section>
-"""
+    return f'<ul style="font-size:13px;color:#cbd5e1">{itens}</ul>'
 
 
 def render_proventos_html(proventos):
@@ -1005,15 +955,20 @@ def render_noticias_html(noticias, ticker):
 """
     itens = ""
     for n in noticias:
-        meta = " • ".join(filter(None, [n["fonte"], n["data"]]))
+        # as fontes (Google, feedparser, Yahoo) devolvem texto puro: o escape é só aqui
+        titulo = _html.escape(n["titulo"])
+        resumo = _html.escape(n["resumo"])
+        fonte = _html.escape(n["fonte"])
+        link = _html.escape(n["link"])
+        meta = " • ".join(filter(None, [fonte, _html.escape(n["data"])]))
         itens += f"""
 <article style="padding:16px 0;border-bottom:1px solid #2a2a2a;">
-  <h3 style="margin:0 0 6px 0;">{n['titulo']}</h3>
+  <h3 style="margin:0 0 6px 0;">{titulo}</h3>
   <p style="font-size:12px;opacity:.7;margin:0 0 8px 0;">{meta}</p>
-  <p style="margin:0 0 10px 0;">{n['resumo']}</p>
-  <a href="{n['link']}" target="_blank" rel="noopener noreferrer"
+  <p style="margin:0 0 10px 0;">{resumo}</p>
+  <a href="{link}" target="_blank" rel="noopener noreferrer"
      style="font-size:13px;text-decoration:underline;">
-    Ler matéria original em {n['fonte']} ↗
+    Ler matéria original em {fonte} ↗
   </a>
 </article>
 """
@@ -1105,7 +1060,7 @@ def gerar_pagina_acao(row):
         bloco_proventos = '<section class="card"><h2>💰 Últimos proventos pagos</h2><p>Dados indisponíveis no momento.</p></section>'
 
     try:
-        noticias = obter_noticias(ticker,empresa)
+        noticias = etapa_noticias.obter(ticker)
         bloco_noticias = render_noticias_html(noticias, ticker)
     except Exception as e:
         print(f"[{ticker}] Erro notícias: {e}")
@@ -1138,7 +1093,8 @@ def gerar_pagina_acao(row):
   <p>{row.get("Resumo", "")}</p>
 
   <h2>💰 A ação está barata?</h2>
-  <p>Preço justo estimado: <strong>R$ {pjusto}</strong></p>
+  <p>Preço justo estimado: <strong>R$ {pjusto}</strong> ({DESCRICAO_MODELO})</p>
+  {render_modelos_html(row)}
   <p>{avaliacao_pl}</p>
 
   <h2>🏦 Dividendos</h2>
@@ -1153,7 +1109,7 @@ def gerar_pagina_acao(row):
   <p>{row.get("Resumo", "")}</p>
 
   <h2>A ação {ticker} está barata?</h2>
-  <p>O preço justo estimado com base no P/L conservador de 15x é de R$ {pjusto}. {avaliacao_pl}</p>
+  <p>O preço justo estimado com base no modelo de {DESCRICAO_MODELO} é de R$ {pjusto}. {avaliacao_pl}</p>
   <p>O P/VP de {pvp} {'indica que a empresa negocia abaixo do valor patrimonial — sinal positivo para value investing.' if pvp < 1 else 'mostra que o mercado precifica a empresa acima do patrimônio líquido.'}</p>
 
   <h2>{ticker} paga bons dividendos?</h2>
@@ -1309,7 +1265,7 @@ def gerar_paginas_seo_ticker(row):
 </div>
 <div class="card">
 <h2>Preço justo de {ticker}</h2>
-<p>Preço justo estimado (P/L 15x): <strong>R$ {pjusto}</strong>.</p>
+<p>Preço justo estimado ({DESCRICAO_MODELO}): <strong>R$ {pjusto}</strong>.</p>
 <p>{"Desconto atual de " + str(desconto) + "%." if desconto > 0 else "Ação negociando acima do preço justo estimado."}</p>
 </div>
 <div class="card">
@@ -1413,8 +1369,7 @@ def gerar_paginas_ranking(df):
         f"""
         <div style="background:rgba(30,41,59,0.6);border:1px solid rgba(255,255,255,0.05);padding:14px;border-radius:12px;display:flex;align-items:center;justify-content:space-between;margin-bottom:10px;">
         <div style="display:flex;align-items:center;gap:10px">
-        <img src="../logos/{row['Ticker']}.png" alt="Logo {row['Empresa']}" loading="lazy"
-             onerror="this.onerror=null;this.src='../logos/default.svg';" style="width:28px;height:28px">
+        {html_logo(row['Ticker'], row['Empresa'])}
         <div>
         <a href="../acoes/{row['Ticker']}.html" style="color:#e2e8f0;text-decoration:none;font-weight:600;">{row['Empresa']}</a>
         <div style="font-size:12px;color:#cbd5e1">{row['Ticker']}</div>
@@ -1429,7 +1384,7 @@ def gerar_paginas_ranking(df):
     gerar_pagina(
         "melhores-acoes-dividendos",
         "Melhores ações de dividendos",
-        f"<div>{lista_div}</div>",
+        f"{css_logos(28)}<div>{lista_div}</div>",
         descricao="Ranking atualizado das melhores ações de dividendos da bolsa.",
         keywords="melhores dividendos, ações dividendos"
     )
@@ -1439,8 +1394,7 @@ def gerar_paginas_ranking(df):
         f"""
         <div style="background:rgba(30,41,59,0.6);border:1px solid rgba(255,255,255,0.05);padding:14px;border-radius:12px;display:flex;align-items:center;justify-content:space-between;margin-bottom:10px;">
         <div style="display:flex;align-items:center;gap:10px">
-        <img src="../logos/{row['Ticker']}.png" alt="Logo {row['Empresa']}" loading="lazy"
-             onerror="this.onerror=null;this.src='../logos/default.svg';" style="width:28px;height:28px">
+        {html_logo(row['Ticker'], row['Empresa'])}
         <div>
         <a href="../acoes/{row['Ticker']}.html" style="color:#e2e8f0;text-decoration:none;font-weight:600;">{row['Empresa']}</a>
         <div style="font-size:12px;color:#cbd5e1">{row['Ticker']}</div>
@@ -1455,7 +1409,7 @@ def gerar_paginas_ranking(df):
     gerar_pagina(
         "acoes-baratas-2026",
         "Ações mais baratas da bolsa",
-        f"<div>{lista_baratas}</div>",
+        f"{css_logos(28)}<div>{lista_baratas}</div>",
         descricao="Veja as ações mais baratas hoje na bolsa.",
         keywords="ações baratas, ações descontadas"
     )
@@ -1889,8 +1843,7 @@ def gerar_paginas_high_intent(df):
             <a href="../acoes/{row['Ticker']}.html" style="text-decoration:none;color:inherit" aria-label="Ver análise de {row['Empresa']} ({row['Ticker']})">
             <div style="background:rgba(30,41,59,0.6);border:1px solid rgba(255,255,255,0.05);padding:14px;border-radius:12px;display:flex;align-items:center;justify-content:space-between;margin-bottom:10px;">
             <div style="display:flex;align-items:center;gap:10px">
-            <img src="../logos/{row['Ticker']}.png" alt="Logo {row['Empresa']}" loading="lazy"
-                 onerror="this.onerror=null;this.src='../logos/default.svg';" style="width:28px;height:28px">
+            {html_logo(row['Ticker'], row['Empresa'])}
             <div>
             <div style="font-weight:600">#{i} {icone} {row['Empresa']}</div>
             <div style="font-size:12px;color:#cbd5e1">{row['Ticker']} • {row['Setor']}</div>
@@ -1909,7 +1862,7 @@ def gerar_paginas_high_intent(df):
     gerar_pagina(
         "melhores-acoes-para-investir",
         "Melhores ações para investir em 2026",
-        f"""<div class="card"><h2>🏆 Melhores ações para investir</h2>
+        f"""{css_logos(28)}<div class="card"><h2>🏆 Melhores ações para investir</h2>
         <p style="color:#22c55e;font-size:13px">Atualizado hoje • Ranking baseado em Score</p>
         {montar_lista(top_score)}</div>""",
         descricao="Veja as melhores ações para investir hoje na bolsa brasileira.",
@@ -1920,7 +1873,7 @@ def gerar_paginas_high_intent(df):
     gerar_pagina(
         "acoes-maior-dividend-yield",
         "Ações com maior dividend yield hoje",
-        f"""<div class="card"><h2>💰 Maiores pagadoras de dividendos</h2>
+        f"""{css_logos(28)}<div class="card"><h2>💰 Maiores pagadoras de dividendos</h2>
         <p style="color:#22c55e;font-size:13px">Atualizado hoje • Ranking por Dividend Yield</p>
         {montar_lista(top_dy)}</div>""",
         descricao="Ranking das ações com maior dividend yield da bolsa.",
@@ -1931,7 +1884,7 @@ def gerar_paginas_high_intent(df):
     gerar_pagina(
         "acoes-maior-roe",
         "Ações com maior ROE da bolsa",
-        f"""<div class="card"><h2>📈 Empresas mais rentáveis</h2>
+        f"""{css_logos(28)}<div class="card"><h2>📈 Empresas mais rentáveis</h2>
         <p style="color:#22c55e;font-size:13px">Atualizado hoje • Ranking por ROE</p>
         {montar_lista(top_roe)}</div>""",
         descricao="Veja as empresas mais rentáveis da bolsa com maior ROE.",
@@ -1942,7 +1895,7 @@ def gerar_paginas_high_intent(df):
     gerar_pagina(
         "acoes-mais-seguras",
         "Ações mais seguras da bolsa",
-        f"""<div class="card"><h2>🛡️ Ações mais seguras</h2>
+        f"""{css_logos(28)}<div class="card"><h2>🛡️ Ações mais seguras</h2>
         <p style="color:#22c55e;font-size:13px">Baixo risco • Score alto</p>
         {montar_lista(seguras)}</div>""",
         descricao="Ranking de ações mais seguras da bolsa brasileira.",
@@ -1953,7 +1906,7 @@ def gerar_paginas_high_intent(df):
     gerar_pagina(
         "acoes-dividendos-mensais",
         "Ações para renda mensal com dividendos",
-        f"""<div class="card"><h2>💵 Renda mensal com dividendos</h2>
+        f"""{css_logos(28)}<div class="card"><h2>💵 Renda mensal com dividendos</h2>
         <p style="color:#cbd5e1;font-size:13px">Empresas com alto pagamento de dividendos</p>
         {montar_lista(renda)}</div>""",
         descricao="Ações que podem gerar renda mensal com dividendos.",
@@ -1988,9 +1941,7 @@ def gerar_paginas_setores(df):
                         margin-bottom:10px;">
                 
                 <div style="display:flex;align-items:center;gap:10px">
-                    <img src="../logos/{row['Ticker']}.png" loading="lazy"
-                         style="width:28px;height:28px"
-                         onerror="this.onerror=null;this.src='../logos/default.svg';">
+                    {html_logo(row['Ticker'], row['Empresa'])}
 
                     <div>
                         <div style="font-weight:600">{row['Empresa']}</div>
@@ -2021,6 +1972,7 @@ def gerar_paginas_setores(df):
             f"melhores-acoes-setor-{slug_setor}",
             f"Melhores ações do setor {setor}",
             f"""
+{css_logos(28)}
 <div class="card">
 <h1>🏢 Melhores ações do setor {setor}</h1>
 <p style="color:#cbd5e1;font-size:14px">
@@ -2083,9 +2035,7 @@ def gerar_paginas_categorias(df):
                         margin-bottom:10px;">
                 
                 <div style="display:flex;align-items:center;gap:10px">
-                    <img src="../logos/{row['Ticker']}.png" loading="lazy"
-                         style="width:28px;height:28px"
-                         onerror="this.onerror=null;this.src='../logos/default.svg';">
+                    {html_logo(row['Ticker'], row['Empresa'])}
 
                     <div>
                         <div style="font-weight:600">{row['Empresa']}</div>
@@ -2116,6 +2066,7 @@ def gerar_paginas_categorias(df):
             f"melhores-acoes-{slug}",
             f"Melhores ações {categoria}",
             f"""
+{css_logos(28)}
 <div class="card">
 <h1>🏆 Melhores ações {categoria}</h1>
 
@@ -4067,30 +4018,14 @@ def gerar_calendario_dividendos_completo(df):
     # COLETAR DIVIDENDOS
     # =========================
 
-    registros = []
-
-    for ticker in df["Ticker"].unique():
-        try:
-            t = yf.Ticker(f"{ticker}.SA")
-            divs = t.dividends
-
-            if divs.empty:
-                continue
-
-            # pega histórico maior para permitir filtro por ano
-            divs = divs.tail(60)
-
-            for data, valor in divs.items():
-                registros.append({
-                    "Ticker": ticker,
-                    "DataPagamento": data,
-                    "ValorProvento": float(valor)
-                })
-
-        except Exception:
-            continue
-
-    df_div = pd.DataFrame(registros)
+    # pega histórico maior para permitir filtro por ano
+    df_div = (
+        tabela_dividendos(df["Ticker"].unique())
+        .sort_values(["Ticker", "Data"])
+        .groupby("Ticker")
+        .tail(60)
+        .rename(columns={"Data": "DataPagamento", "Valor": "ValorProvento"})
+    )
 
     if df_div.empty:
         print("⚠️ Nenhum dividendo encontrado.")
@@ -4516,6 +4451,11 @@ categorias = sorted(df["Categoria"].unique())
 
 logger.info("Gerando site...")
 
+# proventos novos desde a última execução, enquanto as notícias terminam
+atualizar_dividendos(df["Ticker"], max_workers=LIMITES_POR_HOST["yahoo"])
+
+etapa_noticias.aguardar(prazo=NOTICIAS_PRAZO_S)
+
 for _, row in df.iterrows():
     gerar_pagina_acao(row)
     gerar_paginas_seo_ticker(row)
@@ -4548,6 +4488,7 @@ html = f"""<!DOCTYPE html>
 <meta name="keywords" content="ações baratas, bolsa brasileira, value investing, ranking ações, B3">
 <link rel="canonical" href="https://tanoprecinho.site/">
 <link rel="preload" href="font.woff2" as="font" crossorigin>
+{css_logos(20, prefixo='')}
 <link rel="preconnect" href="https://fonts.googleapis.com">
 <link rel="display=swap">
 <meta name="robots" content="index, follow">
@@ -5214,11 +5155,7 @@ for i, (_, row) in enumerate(df.iterrows(), start=1):
 <td>
 <span style="color:#cbd5e1;font-size:12px">#{i} {icone}</span>
 <div style="display:flex;align-items:center;gap:8px">
-<img src="logos/{row['Ticker']}.png" loading="lazy"
-     alt="Logo {row['Empresa']}"
-     loading="lazy"
-     onerror="this.onerror=null;this.src='logos/default.svg';"
-     style="width:20px;height:20px;object-fit:contain">
+{html_logo(row['Ticker'], row['Empresa'], tamanho=20, prefixo='')}
 <a class="ticker" href="acoes/{row['Ticker']}.html" aria-label="Ver análise completa de {row['Empresa']}">
 {row['Ticker']}
 </a>
@@ -5319,4 +5256,11 @@ html += f"""
 with open("docs/index.html", "w", encoding="utf-8") as f:
     f.write(html)
 
+registrar_estatisticas_http()
+registrar_estatisticas_noticias()
+registrar_estatisticas_traducao()
+etapa_traducao.salvar_pendentes()
+salvar_validadores()
+salvar_traducoes()
+
 print("Site atualizado com sucesso.")
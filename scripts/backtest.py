@@ -0,0 +1,170 @@
+# =========================
+# BACKTEST DOS SNAPSHOTS
+# =========================
+#
+# Simula "comprar as N melhores por Score (ou Desconto_%, Ranking...) e
+# rebalancear a cada K dias" sobre os snapshots de data/history. Os CSVs
+# viram um painel data x ticker por coluna; cada combinação de sinal, N e K
+# é só álgebra sobre esse painel, sem laço por ação:
+#
+#   python -m scripts.backtest
+#   python -m scripts.backtest --sinal Score Desconto_% --top 5 10 --dias 7 30
+#
+# Carteira com pesos iguais, sem custos. O universo de cada período são as
+# ações presentes no snapshot do rebalanceamento (as que passaram no filtro
+# de qualidade naquele dia), também com pesos iguais. Uma ação que sai dos
+# snapshots no meio do período é avaliada pelo último preço visto.
+#
+# Acerto por período: fração dos períodos em que a carteira bateu o universo.
+# Acerto por escolha: fração das ações escolhidas que renderam mais que a
+# média do universo no seu período.
+
+import argparse
+import glob
+import os
+import time
+
+import pandas as pd
+
+PASTA = "data/history"
+
+COLUNAS = ["Preco", "Score", "Desconto_%", "Ranking"]
+
+
+def carregar_painel(pasta=PASTA, colunas=COLUNAS):
+    """Painel com colunas (indicador, ticker) e uma linha por data de snapshot."""
+
+    desejadas = {"Ticker", *colunas}
+    partes = []
+
+    for caminho in sorted(glob.glob(os.path.join(pasta, "valuation_*.csv"))):
+
+        data = os.path.basename(caminho)[len("valuation_"):-len(".csv")]
+
+        parte = pd.read_csv(caminho, usecols=lambda c: c in desejadas)
+        parte["Data"] = pd.Timestamp(data)
+        partes.append(parte)
+
+    if not partes:
+        raise FileNotFoundError(f"Nenhum snapshot em {pasta}")
+
+    longo = (
+        pd.concat(partes, ignore_index=True)
+        .dropna(subset=["Ticker"])
+        .drop_duplicates(subset=["Data", "Ticker"], keep="last")
+    )
+
+    return longo.pivot(index="Data", columns="Ticker").sort_index()
+
+
+def datas_rebalanceamento(datas, dias):
+    """Primeira data e, depois, o primeiro snapshot a pelo menos `dias` do anterior."""
+
+    escolhidas = [datas[0]]
+
+    for data in datas[1:]:
+        if (data - escolhidas[-1]).days >= dias:
+            escolhidas.append(data)
+
+    return pd.DatetimeIndex(escolhidas)
+
+
+def simular(painel, sinal="Score", top=10, dias=7):
+    """Períodos da estratégia (DataFrame) e resumo (dict)."""
+
+    presente = painel["Preco"].notna()
+    preco = painel["Preco"].ffill()
+
+    datas = datas_rebalanceamento(painel.index, dias)
+
+    # cada período vai de um rebalanceamento ao seguinte; o último, até o fim
+    limites = datas if datas[-1] == painel.index[-1] else datas.append(painel.index[-1:])
+
+    if len(limites) < 2:
+        raise ValueError("É preciso ao menos dois snapshots para um período")
+
+    inicio = limites[:-1]
+
+    precos = preco.loc[limites]
+    retorno = (precos.shift(-1) / precos - 1).iloc[:-1]
+
+    valor_sinal = painel[sinal].loc[inicio]
+    elegivel = presente.loc[inicio] & valor_sinal.notna() & retorno.notna()
+
+    # empate (Score é inteiro) desempata pela ordem do ticker, de forma estável
+    posicao = valor_sinal.where(elegivel).rank(axis=1, ascending=False, method="first") <= top
+
+    carteira = retorno.where(posicao).mean(axis=1)
+    universo = retorno.where(elegivel).mean(axis=1)
+
+    escolhas = posicao.to_numpy().sum()
+    acertos = retorno.where(posicao).gt(universo, axis=0).to_numpy().sum()
+
+    periodos = pd.DataFrame({
+        "Inicio": inicio,
+        "Fim": limites[1:],
+        "Acoes": posicao.sum(axis=1).to_numpy(),
+        "Carteira": carteira.to_numpy(),
+        "Universo": universo.to_numpy(),
+    })
+    periodos["Excesso"] = periodos["Carteira"] - periodos["Universo"]
+
+    resumo = {
+        "sinal": sinal,
+        "top": top,
+        "dias": dias,
+        "periodos": len(periodos),
+        "carteira_%": ((1 + periodos["Carteira"].fillna(0)).prod() - 1) * 100,
+        "universo_%": ((1 + periodos["Universo"].fillna(0)).prod() - 1) * 100,
+        "excesso_medio_%": periodos["Excesso"].mean() * 100,
+        "acerto_periodos_%": (periodos["Excesso"] > 0).mean() * 100,
+        "acerto_escolhas_%": acertos / escolhas * 100 if escolhas else float("nan"),
+    }
+
+    return periodos, resumo
+
+
+def rodar(painel, sinais, tops, dias_lista):
+    """Resumo de todas as combinações de sinal, N e K, uma linha por estratégia."""
+
+    linhas = [
+        simular(painel, sinal, top, dias)[1]
+        for sinal in sinais
+        for top in tops
+        for dias in dias_lista
+    ]
+
+    return pd.DataFrame(linhas)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Backtest de top-N sobre os snapshots de data/history.")
+    parser.add_argument("--pasta", default=PASTA, help="pasta dos valuation_*.csv")
+    parser.add_argument("--sinal", nargs="+", default=["Score", "Desconto_%"], help="colunas usadas para escolher (maior = melhor)")
+    parser.add_argument("--top", type=int, nargs="+", default=[5, 10, 20], help="tamanhos de carteira")
+    parser.add_argument("--dias", type=int, nargs="+", default=[7, 30], help="intervalos de rebalanceamento em dias")
+    parser.add_argument("--periodos", action="store_true", help="mostra os períodos da primeira estratégia")
+
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    painel = carregar_painel(args.pasta, sorted({"Preco", *args.sinal}))
+    t_carregar = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    resultado = rodar(painel, args.sinal, args.top, args.dias)
+    t_simular = time.perf_counter() - inicio
+
+    datas = painel.index
+    print(
+        f"{len(datas)} snapshots de {datas[0]:%Y-%m-%d} a {datas[-1]:%Y-%m-%d}, "
+        f"{painel['Preco'].shape[1]} tickers (carregados em {t_carregar:.2f} s, "
+        f"{len(resultado)} estratégias simuladas em {t_simular:.2f} s)\n"
+    )
+    print(resultado.round(2).to_string(index=False))
+
+    if args.periodos:
+        periodos, _ = simular(painel, args.sinal[0], args.top[0], args.dias[0])
+        print(f"\n{args.sinal[0]}, top {args.top[0]}, a cada {args.dias[0]} dias")
+        print(periodos.round(dict.fromkeys(["Carteira", "Universo", "Excesso"], 4)).to_string(index=False))
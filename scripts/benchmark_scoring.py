@@ -0,0 +1,126 @@
+# =========================
+# BENCHMARK DO SCORE
+# =========================
+#
+# df.apply(fn, axis=1) x versões vetorizadas de scripts/scoring.py. Gera
+# universos sintéticos com distribuição parecida com a dos dados reais,
+# roda as duas implementações, confere que os resultados são idênticos
+# bit a bit e imprime o tempo de cada uma:
+#
+#   python -m scripts.benchmark_scoring
+#   python -m scripts.benchmark_scoring --linhas 1000 10000 --repeticoes 5
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from scripts.scoring import (
+    value_score, calcular_desconto, calcular_risco, calcular_ranking,
+    score_qualidade, score_valuation, calcular_preco_justo,
+    value_score_vetorizado, calcular_desconto_vetorizado, calcular_risco_vetorizado,
+    calcular_preco_justo_vetorizado,
+    calcular_ranking_vetorizado, score_qualidade_vetorizado, score_valuation_vetorizado,
+    SETOR_PL,
+)
+
+
+def gerar_universo(linhas, semente=42):
+
+    rng = np.random.default_rng(semente)
+
+    df = pd.DataFrame({
+        "Ticker": [f"T{i:06d}" for i in range(linhas)],
+        "Setor": rng.choice(list(SETOR_PL), linhas),
+        "PL": rng.lognormal(2.2, 0.6, linhas).round(4),
+        "PVP": rng.lognormal(0.3, 0.6, linhas).round(4),
+        "ROE": rng.normal(0.14, 0.08, linhas).round(4),
+        "DivYield": rng.exponential(0.05, linhas).round(4),
+        "MarketCap": rng.lognormal(22.5, 1.3, linhas),
+        "Preco": rng.lognormal(3, 0.9, linhas).round(2),
+    })
+
+    # casos de borda: limites exatos, zeros e ausentes
+    df.loc[df.index[::97], "PL"] = 10
+    df.loc[df.index[::89], "PVP"] = 1.5
+    df.loc[df.index[::83], "ROE"] = 0.15
+    df.loc[df.index[::79], "DivYield"] = np.nan
+    df.loc[df.index[::73], "PVP"] = 0
+    df.loc[df.index[::67], "Setor"] = "Outros"
+
+    df["LucroPorAcao"] = df["Preco"] / df["PL"]
+    df["PrecoJusto"] = df["LucroPorAcao"] * 15
+    df.loc[df.index[::71], "PrecoJusto"] = 0
+
+    return df
+
+
+# nome: (função por linha, função vetorizada)
+FUNCOES = {
+    "value_score": (value_score, value_score_vetorizado),
+    "calcular_desconto": (calcular_desconto, calcular_desconto_vetorizado),
+    "calcular_preco_justo": (calcular_preco_justo, calcular_preco_justo_vetorizado),
+    "score_qualidade": (score_qualidade, score_qualidade_vetorizado),
+    "score_valuation": (score_valuation, score_valuation_vetorizado),
+    "calcular_ranking": (calcular_ranking, calcular_ranking_vetorizado),
+    "calcular_risco": (calcular_risco, calcular_risco_vetorizado),
+}
+
+
+def _cronometrar(fn, repeticoes):
+
+    melhor = float("inf")
+
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = fn()
+        melhor = min(melhor, time.perf_counter() - inicio)
+
+    return melhor, resultado
+
+
+def _identicos(a, b):
+
+    a = pd.Series(a).to_numpy()
+    b = pd.Series(b).to_numpy()
+
+    if a.dtype.kind == "f" or b.dtype.kind == "f":
+        a = a.astype(float)
+        b = b.astype(float)
+        # compara os bits: pega diferença até no último dígito e trata NaN = NaN
+        return a.shape == b.shape and bool(np.array_equal(a.view(np.int64), b.view(np.int64)))
+
+    return a.shape == b.shape and bool((a == b).all())
+
+
+def rodar(linhas_lista, repeticoes):
+
+    for linhas in linhas_lista:
+
+        df = gerar_universo(linhas)
+        df["Desconto_%"] = calcular_desconto_vetorizado(df)
+
+        print(f"\n{linhas:,} linhas".replace(",", "."))
+        print(f"  {'função':<22}{'apply (s)':>12}{'vetorizado (s)':>16}{'ganho':>10}  idêntico")
+
+        for nome, (por_linha, vetorizada) in FUNCOES.items():
+
+            t_apply, esperado = _cronometrar(lambda: df.apply(por_linha, axis=1), 1 if linhas > 10_000 else repeticoes)
+            t_vetor, obtido = _cronometrar(lambda: vetorizada(df), repeticoes)
+
+            print(
+                f"  {nome:<22}{t_apply:>12.4f}{t_vetor:>16.5f}{t_apply / t_vetor:>9.0f}x"
+                f"  {'sim' if _identicos(esperado, obtido) else 'NÃO'}"
+            )
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Compara o score por linha com o vetorizado.")
+    parser.add_argument("--linhas", type=int, nargs="+", default=[1_000, 10_000, 100_000], help="tamanhos de universo")
+    parser.add_argument("--repeticoes", type=int, default=3, help="melhor de N execuções")
+
+    args = parser.parse_args()
+
+    rodar(args.linhas, args.repeticoes)
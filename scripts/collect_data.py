@@ -1,16 +1,21 @@
-import yfinance as yf
+import asyncio
 import pandas as pd
-import random
 import time
 from tqdm import tqdm
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from deep_translator import GoogleTranslator
+import queue
+import threading
 import time
-import random
-import requests
 import json
 import os
 import datetime
+from scripts.logger import logger
+from scripts.info_cache import obter_com_cache
+from scripts.issuers import info_do_emissor
+from scripts.market_bundle import obter_pacote, limpar_pacotes
+from scripts.rate_limiter import executar, falha_temporaria, rajada, verificar_status
+from scripts.http_client import http_get
+from scripts.negative_cache import SEM_PRECO, SEM_MARKET_CAP
+from scripts.negative_cache import filtrar_negativados, registrar_negativo, limpar_negativo, salvar_negativos
 
 # =========================
 # BUSCAR TICKERS DA B3
@@ -20,6 +25,9 @@ import datetime
 
 CACHE_DIR = "cache"
 
+# aponta para o servidor simulado em testes de carga
+BRAPI_BASE_URL = os.environ.get("BRAPI_BASE_URL", "https://brapi.dev")
+
 def salvar_cache_tickers(tickers):
 
     os.makedirs(CACHE_DIR, exist_ok=True)
@@ -74,9 +82,9 @@ def get_b3_tickers():
 
         print("Buscando lista de ativos da B3...")
 
-        url = "https://brapi.dev/api/available"
+        url = f"{BRAPI_BASE_URL}/api/available"
 
-        response = requests.get(url, timeout=15)
+        response = executar("brapi", lambda: verificar_status(http_get(url, timeout=15)), chave=url)
 
         response.raise_for_status()
 
@@ -154,102 +162,599 @@ def filtrar_acoes_validas(tickers):
     return list(set(tickers_validos))
 
 
+# =========================
+# PRÉ-FILTRO DE MERCADO (EM LOTE)
+# =========================
+
+# mesmo corte que main.py aplica depois da coleta
+MARKET_CAP_MINIMO = 1_000_000_000
+
+TAMANHO_LOTE = 200
+
+
+def buscar_cotacoes_em_lote(max_paginas=20):
+    """Preço e market cap do mercado inteiro em poucas requisições paginadas."""
+
+    url = f"{BRAPI_BASE_URL}/api/quote/list"
+
+    cotacoes = {}
+
+    for pagina in range(1, max_paginas + 1):
+
+        params = {"limit": TAMANHO_LOTE, "page": pagina, "type": "stock"}
+
+        response = executar(
+            "brapi",
+            lambda: verificar_status(http_get(url, params=params, timeout=15)),
+            chave=f"{url}?page={pagina}"
+        )
+
+        response.raise_for_status()
+
+        data = response.json()
+
+        for item in data.get("stocks", []):
+
+            ticker = item.get("stock")
+
+            if ticker:
+                cotacoes[ticker] = {
+                    "Preco": item.get("close"),
+                    "MarketCap": item.get("market_cap"),
+                }
+
+        if not data.get("hasNextPage") or pagina >= (data.get("totalPages") or 0):
+            break
+
+    return cotacoes
+
+
+def prefiltrar_por_mercado(tickers, market_cap_minimo=MARKET_CAP_MINIMO):
+    """
+    Descarta, antes do .info caro, os tickers que certamente cairiam no filtro
+    de market cap do main.py. Ticker ausente do lote ou sem market cap segue
+    para a coleta normal: na dúvida, não descarta.
+    """
+
+    try:
+
+        cotacoes = buscar_cotacoes_em_lote()
+
+    except Exception as e:
+
+        print("Falha no pré-filtro em lote, seguindo com o universo completo:", e)
+
+        return tickers
+
+    sobreviventes = []
+
+    for t in tickers:
+
+        cotacao = cotacoes.get(t)
+
+        if cotacao is None:
+            sobreviventes.append(t)
+            continue
+
+        preco = cotacao["Preco"]
+        market_cap = cotacao["MarketCap"]
+
+        if not preco or preco <= 0:
+            continue
+
+        if market_cap is not None and market_cap <= market_cap_minimo:
+            continue
+
+        sobreviventes.append(t)
+
+    descartados = len(tickers) - len(sobreviventes)
+
+    print(f"Pré-filtro em lote: {len(sobreviventes)} de {len(tickers)} seguem para a coleta ({descartados} consultas .info evitadas).")
+    logger.info(f"Pré-filtro em lote descartou {descartados} tickers sem preço ou com market cap <= {market_cap_minimo}.")
+
+    return sobreviventes
+
+
 # =========================
 # COLETA FUNDAMENTALISTA
 # =========================
 
-def get_stock_data(tickers, traducao_setores, classificar_cap):
+# requisições simultâneas por host: yahoo na coleta async, tradutor na etapa de
+# tradução. Saem da rajada do token bucket (rate_limiter.LIMITES), que é o
+# teto real: vagas além dela só esperariam token, gastando o prazo do ticker.
+# Para coletar mais rápido, é LIMITES que precisa subir.
+LIMITES_POR_HOST = {host: rajada(host) for host in ("yahoo", "tradutor")}
 
-    tickers = filtrar_acoes_validas(tickers)
+# prazo de um ticker (contado de quando ele começa a ser buscado)
+PRAZO_TICKER_S = 60
 
-    def buscar_ticker(ticker):
+# orçamento total da etapa de coleta
+ORCAMENTO_COLETA_S = 40 * 60
 
-        for tentativa in range(3):
 
-            try:
+def _buscar_precos_yahoo(ticker):
+    return obter_pacote(ticker).fast_info
 
-                acao = yf.Ticker(f"{ticker}.SA")
 
-                fast = acao.fast_info
-                info = acao.info
+def _buscar_info_yahoo(ticker):
+    return obter_pacote(ticker).info
 
-                preco = fast.get("lastPrice")
-                market_cap = fast.get("marketCap")
 
-                if not preco or not market_cap:
-                    return None
+def _buscar_info_emissor(ticker):
+    # .info da própria classe; resumo/setor/site vazios vêm de outra classe da empresa
+    return info_do_emissor(ticker, _buscar_info_yahoo)
 
-                dy = info.get("dividendYield") or 0
-                roe = info.get("returnOnEquity") or 0
 
-                # normalização
-                if dy > 1:
-                    dy = dy / 100
+# desligado por comparar_modos_coleta: as duas rodadas medem a rede, não o disco
+_usar_cache_info = True
 
-                if roe > 1:
-                    roe = roe / 100
 
-                setor_original = info.get("sector", "Não informado")
-                
-                resumo = info.get("longBusinessSummary", "")
-                site = info.get("website", "")
+def _consultar_yahoo(ticker):
 
-                # fallback
-                if not resumo:
-                    resumo = f"A empresa {info.get('shortName', ticker)} atua no setor de {traducao_setores.get(setor_original, setor_original)}."
+    if not _usar_cache_info:
+        return _buscar_precos_yahoo(ticker), _buscar_info_emissor(ticker)
 
-                # traduzir para português
-                try:
-                    if resumo:
-                        resumo = GoogleTranslator(source='auto', target='pt').translate(resumo)
-                        time.sleep(random.uniform(0.2, 0.5))
-                except:
-                    pass
-
-                # fallback se não tiver resumo
-                if not resumo:
-                    resumo = f"A empresa {info.get('shortName', ticker)} atua no setor de {traducao_setores.get(info.get('sector', ''), info.get('sector', 'Não informado'))}."
-
-                return {
-                    "Ticker": ticker,
-                    "Empresa": info.get("shortName", ticker),
-                    "Resumo": resumo,
-                    "Site": site,
-                    "setor_original": setor_original,
-                    "Setor": traducao_setores.get(setor_original, setor_original),
-                    "PL": info.get("trailingPE") or 0,
-                    "PVP": info.get("priceToBook") or 0,
-                    "ROE": roe,
-                    "DivYield": dy,
-                    "MarketCap": market_cap,
-                    "Preco": preco,
-                    "Categoria": classificar_cap(market_cap)
-                }
-            
+    # só vai à rede para as camadas do cache que expiraram
+    return obter_com_cache(ticker, _buscar_precos_yahoo, _buscar_info_emissor)
 
-            except Exception:
 
-                time.sleep(random.uniform(0.3, 0.8))
+def _resumo_padrao(ticker, info, traducao_setores):
+
+    setor = info.get("sector", "Não informado")
 
+    return f"A empresa {info.get('shortName', ticker)} atua no setor de {traducao_setores.get(setor, setor)}."
+
+
+def _extrair_registro(ticker, fast, info, traducao_setores, classificar_cap):
+
+    preco = fast.get("lastPrice")
+    market_cap = fast.get("marketCap")
+
+    if not preco or not market_cap:
         return None
 
+    dy = info.get("dividendYield") or 0
+    roe = info.get("returnOnEquity") or 0
+
+    # normalização
+    if dy > 1:
+        dy = dy / 100
+
+    if roe > 1:
+        roe = roe / 100
+
+    setor_original = info.get("sector", "Não informado")
+
+    resumo = info.get("longBusinessSummary", "")
+    site = info.get("website", "")
+
+    # fallback
+    if not resumo:
+        resumo = _resumo_padrao(ticker, info, traducao_setores)
+
+    return {
+        "Ticker": ticker,
+        "Empresa": info.get("shortName", ticker),
+        "Resumo": resumo,
+        "Site": site,
+        "setor_original": setor_original,
+        "Setor": traducao_setores.get(setor_original, setor_original),
+        "PL": info.get("trailingPE") or 0,
+        "PVP": info.get("priceToBook") or 0,
+        "ROE": roe,
+        "DivYield": dy,
+        "MarketCap": market_cap,
+        "Preco": preco,
+        "Categoria": classificar_cap(market_cap)
+    }
+
+
+def _registrar_resultado_precos(ticker, fast):
+
+    # alimenta o cache negativo: vazio entra, com dados sai
+    if not fast.get("lastPrice"):
+        registrar_negativo(ticker, SEM_PRECO)
+    elif not fast.get("marketCap"):
+        registrar_negativo(ticker, SEM_MARKET_CAP)
+    else:
+        limpar_negativo(ticker)
+
+
+class TickerIndisponivel(Exception):
+    pass
+
+
+def _indisponivel(ticker, erro):
+
+    # tentativas esgotadas ou circuito aberto: não é falta de dado, então o
+    # ticker entra nos pulados e é buscado primeiro na próxima execução
+    logger.warning(f"[{ticker}] Yahoo indisponível ({type(erro).__name__}: {erro}); fica para a próxima execução")
+
+    return TickerIndisponivel(ticker)
+
+
+def buscar_ticker(ticker, traducao_setores, classificar_cap):
+
+    # novas tentativas, backoff e pausas ficam a cargo do rate_limiter
+    try:
+        fast, info = _consultar_yahoo(ticker)
+    except Exception as e:
+        if falha_temporaria(e):
+            raise _indisponivel(ticker, e) from e
+        return None
+
+    _registrar_resultado_precos(ticker, fast)
+
+    # o resumo sai no original; a tradução é uma etapa própria (translation_service)
+    return _extrair_registro(ticker, fast, info, traducao_setores, classificar_cap)
+
+
+# resultado de ticker que o Yahoo não respondeu (vai para os pulados)
+INDISPONIVEL = object()
+
+
+def _coletar_threads(tickers, traducao_setores, classificar_cap, prazo_ticker, orcamento, max_workers=4):
+
+    fila = queue.Queue()
+
+    for t in tickers:
+        fila.put(t)
+
+    resultados = queue.Queue()
+    em_andamento = {}
+    abandonados = set()
+    lock = threading.Lock()
+    encerrar = threading.Event()
+
+    def trabalhador():
+
+        while not encerrar.is_set():
+
+            try:
+                ticker = fila.get_nowait()
+            except queue.Empty:
+                return
+
+            with lock:
+                em_andamento[ticker] = time.monotonic()
+
+            try:
+                resultado = buscar_ticker(ticker, traducao_setores, classificar_cap)
+            except TickerIndisponivel:
+                resultado = INDISPONIVEL
+            except Exception:
+                resultado = None
+
+            # checagem, saída de em_andamento e entrega sob o mesmo lock: o
+            # coletor não tem como abandonar o ticker depois que ele foi entregue
+            with lock:
+
+                # o coletor já desistiu deste ticker e pôs outro trabalhador no lugar
+                if ticker in abandonados:
+                    return
+
+                del em_andamento[ticker]
+                resultados.put((ticker, resultado))
+
+    def iniciar_trabalhador():
+        # daemon: uma chamada travada não impede o processo de terminar
+        threading.Thread(target=trabalhador, daemon=True).start()
+
+    for _ in range(max_workers):
+        iniciar_trabalhador()
 
     dados = []
+    pulados = []
+    concluidos = set()
+    fim = time.monotonic() + orcamento
 
-    with ThreadPoolExecutor(max_workers=4) as executor:
+    with tqdm(total=len(tickers), desc="Buscando dados") as barra:
 
-        futures = [executor.submit(buscar_ticker, t) for t in tickers]
+        while len(concluidos) < len(tickers):
 
-        for future in tqdm(as_completed(futures), total=len(futures), desc="Buscando dados"):
+            restante = fim - time.monotonic()
+
+            if restante <= 0:
+                break
 
             try:
 
-                resultado = future.result(timeout=10)
+                ticker, resultado = resultados.get(timeout=min(1.0, restante))
+
+                concluidos.add(ticker)
+                barra.update(1)
+
+                if resultado is INDISPONIVEL:
+                    pulados.append(ticker)
+                elif resultado:
+                    dados.append(resultado)
+
+            except queue.Empty:
+                pass
+
+            # prazo por ticker: abandona a chamada travada e repõe o trabalhador
+            agora = time.monotonic()
+
+            with lock:
+
+                vencidos = [t for t, inicio in em_andamento.items() if agora - inicio > prazo_ticker]
+
+                for t in vencidos:
+                    del em_andamento[t]
+                    abandonados.add(t)
+
+            for t in vencidos:
+                concluidos.add(t)
+                pulados.append(t)
+                barra.update(1)
+                iniciar_trabalhador()
+
+    encerrar.set()
+
+    # orçamento esgotado: o que não terminou fica para a próxima execução
+    pulados += [t for t in tickers if t not in concluidos]
+
+    return dados, pulados
+
+
+# =========================
+# COLETA ASYNC
+# =========================
+
+def _em_thread(fn, *args):
+    """
+    Como run_in_executor, mas numa thread daemon: se o prazo estourar,
+    a chamada travada é abandonada sem segurar o fim do processo.
+    """
+
+    loop = asyncio.get_running_loop()
+    futuro = loop.create_future()
+
+    def resolver(resultado, erro):
+
+        if futuro.done():
+            return
+
+        if erro is not None:
+            futuro.set_exception(erro)
+        else:
+            futuro.set_result(resultado)
+
+    def alvo():
+
+        try:
+            resultado, erro = fn(*args), None
+        except Exception as e:
+            resultado, erro = None, e
+
+        try:
+            loop.call_soon_threadsafe(resolver, resultado, erro)
+        except RuntimeError:
+            # loop já encerrado: ninguém espera mais por este resultado
+            pass
+
+    threading.Thread(target=alvo, daemon=True).start()
+
+    return futuro
+
+
+async def _buscar_ticker_async(ticker, semaforos, traducao_setores, classificar_cap, prazo_ticker):
+
+    # o prazo conta a partir da vaga no Yahoo, não do tempo na fila
+    async with semaforos["yahoo"]:
+
+        try:
+            fast, info = await asyncio.wait_for(_em_thread(_consultar_yahoo, ticker), prazo_ticker)
+        except asyncio.TimeoutError:
+            raise
+        except Exception as e:
+            if falha_temporaria(e):
+                raise _indisponivel(ticker, e) from e
+            return None
+
+    _registrar_resultado_precos(ticker, fast)
+
+    return _extrair_registro(ticker, fast, info, traducao_setores, classificar_cap)
+
+
+def _limites_async(limites=None):
+    """Vagas por host da coleta async; pedido acima da rajada do bucket é reduzido a ela."""
+
+    pedidos = {**LIMITES_POR_HOST, **(limites or {})}
+
+    return {host: min(n, rajada(host)) for host, n in pedidos.items()}
+
+
+async def _coletar_async(tickers, traducao_setores, classificar_cap, limites, prazo_ticker, orcamento):
+
+    loop = asyncio.get_running_loop()
+
+    semaforos = {host: asyncio.Semaphore(n) for host, n in limites.items()}
+
+    tarefas = {
+        asyncio.ensure_future(
+            _buscar_ticker_async(t, semaforos, traducao_setores, classificar_cap, prazo_ticker)
+        ): t
+        for t in tickers
+    }
+
+    dados = []
+    pulados = []
+    pendentes = set(tarefas)
+    fim = loop.time() + orcamento
+
+    with tqdm(total=len(tarefas), desc="Buscando dados (async)") as barra:
+
+        while pendentes:
+
+            restante = fim - loop.time()
+
+            if restante <= 0:
+                break
+
+            feitos, pendentes = await asyncio.wait(pendentes, timeout=restante, return_when=asyncio.FIRST_COMPLETED)
+
+            for tarefa in feitos:
+
+                barra.update(1)
+
+                try:
+                    resultado = tarefa.result()
+                except (asyncio.TimeoutError, TickerIndisponivel):
+                    pulados.append(tarefas[tarefa])
+                    continue
+                except Exception:
+                    continue
 
                 if resultado:
                     dados.append(resultado)
 
-            except:
-                continue
+    # orçamento esgotado: o que não terminou fica para a próxima execução
+    for tarefa in pendentes:
+        tarefa.cancel()
+        pulados.append(tarefas[tarefa])
+
+    return dados, pulados
+
+
+# =========================
+# PENDENTES ENTRE EXECUÇÕES
+# =========================
+
+PENDENTES_ARQUIVO = "data/cache/pendentes.json"
+
+
+def carregar_pendentes():
+
+    try:
+        with open(PENDENTES_ARQUIVO, "r", encoding="utf-8") as f:
+            return json.load(f).get("tickers", [])
+    except Exception:
+        return []
+
+
+def salvar_pendentes(pulados):
+
+    os.makedirs(os.path.dirname(PENDENTES_ARQUIVO), exist_ok=True)
+
+    with open(PENDENTES_ARQUIVO, "w", encoding="utf-8") as f:
+        json.dump({
+            "data": datetime.datetime.now().isoformat(timespec="seconds"),
+            "tickers": sorted(pulados),
+        }, f, ensure_ascii=False, indent=2)
+
+
+def priorizar_pendentes(tickers):
+
+    # quem ficou de fora na última execução é atualizado primeiro
+    pendentes = set(carregar_pendentes())
+
+    return [t for t in tickers if t in pendentes] + [t for t in tickers if t not in pendentes]
+
+
+def _preparar_tickers(tickers):
+    return priorizar_pendentes(filtrar_negativados(filtrar_acoes_validas(tickers)))
+
+
+def _finalizar_coleta(dados, pulados):
+
+    salvar_pendentes(pulados)
+    salvar_negativos()
+
+    if pulados:
+        print(f"{len(pulados)} tickers ficaram de fora por prazo/orçamento/falha do Yahoo e serão priorizados na próxima execução.")
+        logger.warning(f"Coleta parcial: {len(pulados)} tickers pulados: {', '.join(sorted(pulados))}")
+
+    df = pd.DataFrame(dados)
+    df.attrs["pulados"] = pulados
+
+    return df
+
+
+def get_stock_data_async(tickers, traducao_setores, classificar_cap, limites=None,
+                         prazo_ticker=PRAZO_TICKER_S, orcamento=ORCAMENTO_COLETA_S):
+
+    tickers = _preparar_tickers(tickers)
+
+    limites = _limites_async(limites)
+
+    dados, pulados = asyncio.run(
+        _coletar_async(tickers, traducao_setores, classificar_cap, limites, prazo_ticker, orcamento)
+    )
+
+    return _finalizar_coleta(dados, pulados)
+
+
+# =========================
+# COMPARAÇÃO DE MODOS
+# =========================
+
+def comparar_modos_coleta(tickers, traducao_setores, classificar_cap, limites=None,
+                          prazo_ticker=PRAZO_TICKER_S, orcamento=ORCAMENTO_COLETA_S):
+
+    global _usar_cache_info
+
+    tickers = _preparar_tickers(tickers)
+
+    limites = _limites_async(limites)
+
+    # nenhuma rodada lê o cache de .info nem os pacotes já carregados pela outra
+    _usar_cache_info = False
+
+    try:
+
+        limpar_pacotes()
+
+        inicio = time.perf_counter()
+        dados_threads, _ = _coletar_threads(tickers, traducao_setores, classificar_cap, prazo_ticker, orcamento)
+        tempo_threads = time.perf_counter() - inicio
+
+        limpar_pacotes()
+
+        # mesma lista nos dois modos: o cache negativo da 1ª rodada não encurta a 2ª
+        inicio = time.perf_counter()
+        dados_async, pulados = asyncio.run(
+            _coletar_async(tickers, traducao_setores, classificar_cap, limites, prazo_ticker, orcamento)
+        )
+        tempo_async = time.perf_counter() - inicio
+
+    finally:
+        _usar_cache_info = True
+
+    df_async = _finalizar_coleta(dados_async, pulados)
+
+    ganho = tempo_threads / tempo_async if tempo_async > 0 else 0
+
+    resumo = (
+        f"Coleta de {len(tickers)} tickers — "
+        f"threads: {tempo_threads:.1f}s ({len(dados_threads)} linhas) | "
+        f"async: {tempo_async:.1f}s ({len(df_async)} linhas) | "
+        f"ganho: {ganho:.2f}x"
+    )
+
+    print(resumo)
+    logger.info(resumo)
+
+    return df_async, {
+        "threads_s": tempo_threads,
+        "async_s": tempo_async,
+        "linhas_threads": len(dados_threads),
+        "linhas_async": len(df_async),
+    }
+
+
+def get_stock_data(tickers, traducao_setores, classificar_cap, modo="threads", limites=None,
+                   prazo_ticker=PRAZO_TICKER_S, orcamento=ORCAMENTO_COLETA_S):
+
+    if modo == "async":
+        return get_stock_data_async(tickers, traducao_setores, classificar_cap, limites, prazo_ticker, orcamento)
+
+    if modo == "comparar":
+        df, _ = comparar_modos_coleta(tickers, traducao_setores, classificar_cap, limites, prazo_ticker, orcamento)
+        return df
+
+    tickers = _preparar_tickers(tickers)
+
+    dados, pulados = _coletar_threads(tickers, traducao_setores, classificar_cap, prazo_ticker, orcamento)
 
-    return pd.DataFrame(dados)
+    return _finalizar_coleta(dados, pulados)
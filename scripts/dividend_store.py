@@ -0,0 +1,193 @@
+import datetime
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from scripts.logger import logger
+from scripts.market_bundle import obter_pacote
+
+# =========================
+# BASE DE PROVENTOS
+# =========================
+#
+# Todos os proventos já vistos ficam numa tabela só (Ticker, Data, Valor),
+# chaveada por ticker + data, em data/cache/dividendos.csv. A cada execução
+# cada ticker busca apenas os eventos a partir da última data guardada, ou
+# da última checagem se ele nunca pagou nada (no máximo uma vez por dia); o
+# histórico completo só é baixado na primeira vez. O card de proventos da ação e o calendário leem daqui, sem rede.
+
+ARQUIVO = "data/cache/dividendos.csv"
+META_ARQUIVO = "data/cache/dividendos_meta.json"
+
+COLUNAS = ["Ticker", "Data", "Valor"]
+
+_tabela = None
+_meta = None
+_lock = threading.Lock()
+_estatisticas = {"completos": 0, "incrementais": 0, "em_dia": 0, "novos_eventos": 0, "falhas": 0}
+
+
+def _carregar():
+
+    global _tabela, _meta
+
+    if _tabela is None:
+
+        try:
+            _tabela = pd.read_csv(ARQUIVO, dtype={"Ticker": str, "Data": str, "Valor": float})
+        except Exception:
+            _tabela = pd.DataFrame(columns=COLUNAS)
+
+        try:
+            with open(META_ARQUIVO, "r", encoding="utf-8") as f:
+                _meta = json.load(f)
+        except Exception:
+            _meta = {}
+
+    return _tabela
+
+
+def _ultima_data(ticker):
+
+    with _lock:
+        tabela = _carregar()
+        datas = tabela.loc[tabela["Ticker"] == ticker, "Data"]
+
+    return datas.max() if not datas.empty else None
+
+
+def _para_registros(ticker, serie):
+
+    if serie is None or serie.empty:
+        return pd.DataFrame(columns=COLUNAS)
+
+    # a data local do pagamento; o fuso do Yahoo não interessa aqui
+    datas = pd.DatetimeIndex(serie.index)
+
+    if datas.tz is not None:
+        datas = datas.tz_convert("America/Sao_Paulo").tz_localize(None)
+
+    return pd.DataFrame({
+        "Ticker": ticker,
+        "Data": datas.strftime("%Y-%m-%d"),
+        "Valor": serie.to_numpy(dtype=float),
+    })
+
+
+def atualizar_dividendos(ticker):
+
+    global _tabela
+
+    hoje = datetime.date.today().isoformat()
+
+    with _lock:
+        _carregar()
+        checado = _meta.get(ticker)
+
+    if checado == hoje:
+        _contar("em_dia")
+        return
+
+    # a partir da última data: o evento do dia pode ter sido corrigido; sem
+    # eventos guardados, a partir da última checagem (que já não achou nada)
+    desde = _ultima_data(ticker) or checado
+
+    try:
+        if desde is None:
+            serie = obter_pacote(ticker).dividends
+            _contar("completos")
+        else:
+            serie = obter_pacote(ticker).dividendos_desde(datetime.date.fromisoformat(desde))
+            _contar("incrementais")
+    except Exception as e:
+        logger.warning(f"[{ticker}] Erro ao atualizar proventos: {e}")
+        _contar("falhas")
+        return
+
+    novos = _para_registros(ticker, serie)
+
+    with _lock:
+
+        antes = len(_tabela)
+
+        if not novos.empty:
+            _tabela = (
+                pd.concat([_tabela, novos], ignore_index=True)
+                .drop_duplicates(subset=["Ticker", "Data"], keep="last")
+            )
+
+        _estatisticas["novos_eventos"] += len(_tabela) - antes
+        _meta[ticker] = hoje
+
+
+def _contar(chave):
+    with _lock:
+        _estatisticas[chave] += 1
+
+
+def atualizar_todos(tickers, max_workers=8):
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(atualizar_dividendos, list(dict.fromkeys(tickers))))
+
+    salvar_dividendos()
+
+    with _lock:
+        valores = dict(_estatisticas)
+
+    mensagem = (
+        f"Proventos: {valores['completos']} históricos completos, {valores['incrementais']} incrementais, "
+        f"{valores['em_dia']} já em dia, {valores['novos_eventos']} eventos novos, {valores['falhas']} falhas"
+    )
+
+    print(mensagem)
+    logger.info(mensagem)
+
+
+def obter_dividendos(ticker):
+    """Série de proventos guardados do ticker (índice de datas, crescente), sem rede."""
+
+    with _lock:
+        tabela = _carregar()
+        linhas = tabela[tabela["Ticker"] == ticker]
+
+    serie = pd.Series(
+        linhas["Valor"].to_numpy(dtype=float),
+        index=pd.to_datetime(linhas["Data"]),
+        name="Dividends",
+    )
+
+    return serie.sort_index()
+
+
+def tabela_dividendos(tickers=None):
+    """Tabela (Ticker, Data, Valor) da base inteira ou só dos tickers pedidos."""
+
+    with _lock:
+        tabela = _carregar().copy()
+
+    if tickers is not None:
+        tabela = tabela[tabela["Ticker"].isin(set(tickers))]
+
+    tabela["Data"] = pd.to_datetime(tabela["Data"])
+
+    return tabela
+
+
+def salvar_dividendos():
+
+    with _lock:
+        tabela = _carregar().sort_values(["Ticker", "Data"])
+        meta = dict(_meta)
+
+    os.makedirs(os.path.dirname(ARQUIVO), exist_ok=True)
+
+    temporario = f"{ARQUIVO}.tmp"
+    tabela.to_csv(temporario, index=False)
+    os.replace(temporario, ARQUIVO)
+
+    with open(META_ARQUIVO, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2, sort_keys=True)
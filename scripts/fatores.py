@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+from scripts.scoring import value_score_vetorizado
+
+# =========================
+# SCORE POR FATORES
+# =========================
+#
+# Alternativa às faixas fixas de value_score: cada indicador vira um fator
+# comparado com o resto do universo do dia, em vez de um limite como
+# "PL < 10". Para cada fator saem duas colunas:
+#
+#   Pct_<fator>  percentil no universo inteiro (0 a 1, maior = melhor)
+#   Z_<fator>    z-score dentro do setor (neutro ao setor), limitado a ±3
+#
+# P/L e P/VP entram invertidos (lucro e patrimônio por real de preço), o que
+# põe prejuízo e patrimônio negativo no fim da fila sem caso especial; o
+# market cap entra em log. O ScoreFatores (0 a 100) é o percentil da soma
+# ponderada dos z-scores, com os mesmos pesos de value_score. Fator ausente
+# ou setor sem variação conta como z = 0, ou seja, na média do setor.
+#
+# Tudo sai de uma passada: rank e groupby/transform sobre as cinco colunas
+# juntas, sem laço por linha nem por setor.
+
+# fator: (transformação, peso)
+FATORES = {
+    "PL": ("inverso", 0.25),
+    "PVP": ("inverso", 0.25),
+    "ROE": ("direto", 0.20),
+    "DivYield": ("direto", 0.15),
+    "MarketCap": ("log", 0.15),
+}
+
+Z_LIMITE = 3
+
+MODOS = ("regras", "fatores")
+
+
+def _orientados(df):
+    """Valores dos fatores já no sentido "maior = melhor"; inf e inválidos viram NaN."""
+
+    valores = {}
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+
+        for fator, (transformacao, _) in FATORES.items():
+
+            coluna = df[fator].to_numpy(dtype=float)
+
+            if transformacao == "inverso":
+                coluna = 1 / coluna
+            elif transformacao == "log":
+                coluna = np.where(coluna > 0, np.log(coluna), np.nan)
+
+            valores[fator] = np.where(np.isfinite(coluna), coluna, np.nan)
+
+    return pd.DataFrame(valores, index=df.index)
+
+
+def calcular_fatores(df, grupo="Setor"):
+    """Percentis, z-scores setoriais e ScoreFatores, no índice de df."""
+
+    valores = _orientados(df)
+
+    percentis = valores.rank(pct=True)
+
+    setores = valores.groupby(df[grupo].to_numpy(), dropna=False)
+    media = setores.transform("mean")
+    desvio = setores.transform("std", ddof=0)
+
+    z = ((valores - media) / desvio.where(desvio > 0)).clip(-Z_LIMITE, Z_LIMITE).fillna(0.0)
+
+    pesos = pd.Series({fator: peso for fator, (_, peso) in FATORES.items()})
+    composto = z.mul(pesos, axis=1).sum(axis=1)
+
+    resultado = pd.concat([percentis.add_prefix("Pct_"), z.add_prefix("Z_")], axis=1)
+    resultado["ScoreFatores"] = (composto.rank(pct=True) * 100).round().astype("int64")
+
+    return resultado
+
+
+def aplicar_fatores(df, modo="regras"):
+    """Acrescenta as colunas de fatores e define Score pelo modo escolhido."""
+
+    if modo not in MODOS:
+        raise ValueError(f"Modo de score desconhecido: {modo} (opções: {', '.join(MODOS)})")
+
+    fatores = calcular_fatores(df)
+
+    df = df.copy()
+    df[fatores.columns] = fatores
+    df["Score"] = df["ScoreFatores"] if modo == "fatores" else value_score_vetorizado(df)
+
+    return df
@@ -30,4 +30,19 @@ def carregar_historico(periodo_dias):
     if not dados:
         return pd.DataFrame()
 
-    return pd.concat(dados)
\ No newline at end of file
+    return pd.concat(dados)
+
+def carregar_ultimo_snapshot(pasta="data/history"):
+    """Snapshot mais recente (valuation_AAAA-MM-DD.csv) e o caminho dele."""
+
+    arquivos = sorted(
+        a for a in os.listdir(pasta)
+        if a.startswith("valuation_") and a.endswith(".csv")
+    )
+
+    if not arquivos:
+        raise FileNotFoundError(f"Nenhum snapshot em {pasta}")
+
+    caminho = os.path.join(pasta, arquivos[-1])
+
+    return pd.read_csv(caminho), caminho
@@ -0,0 +1,147 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import EmptyPoolError
+
+from scripts.logger import logger
+
+# =========================
+# SESSÃO HTTP COMPARTILHADA
+# =========================
+#
+# Uma única requests.Session para o pipeline inteiro (brapi, logos, RSS,
+# Yahoo via servidor simulado): conexões keep-alive reaproveitadas entre
+# chamadas, compressão gzip e um teto de conexões simultâneas por host
+# (pool_block=True faz quem passar do teto esperar uma conexão livre).
+
+CONEXOES_POR_HOST_PADRAO = 10
+
+# prefixo de URL: conexões simultâneas
+CONEXOES_POR_HOST = {
+    "https://brapi.dev": 4,
+    "https://news.google.com": 6,
+    "https://raw.githubusercontent.com": 8,
+}
+
+CABECALHOS = {
+    "User-Agent": "Mozilla/5.0 (compatible; TanoPrecinho/1.0)",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+}
+
+# espera máxima por uma conexão livre do host; sem ela, uma conexão que não
+# voltou ao pool deixaria as próximas requisições esperando para sempre
+ESPERA_CONEXAO_S = 30
+
+_sessao = None
+_adaptadores = []
+_lock = threading.Lock()
+
+
+class _PoolHttp(HTTPConnectionPool):
+
+    def _get_conn(self, timeout=None):
+        return super()._get_conn(ESPERA_CONEXAO_S if timeout is None else timeout)
+
+
+class _PoolHttps(HTTPSConnectionPool):
+
+    def _get_conn(self, timeout=None):
+        return super()._get_conn(ESPERA_CONEXAO_S if timeout is None else timeout)
+
+
+class _Adaptador(HTTPAdapter):
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _PoolHttp, "https": _PoolHttps}
+
+
+def _novo_adaptador(conexoes):
+
+    # pool_connections alto para o LRU do urllib3 não descartar pools (e estatísticas)
+    adaptador = _Adaptador(pool_connections=50, pool_maxsize=conexoes, pool_block=True)
+
+    _adaptadores.append(adaptador)
+
+    return adaptador
+
+
+def obter_sessao():
+
+    global _sessao
+
+    with _lock:
+
+        if _sessao is None:
+
+            sessao = requests.Session()
+            sessao.headers.update(CABECALHOS)
+
+            padrao = _novo_adaptador(CONEXOES_POR_HOST_PADRAO)
+            sessao.mount("https://", padrao)
+            sessao.mount("http://", padrao)
+
+            for prefixo, conexoes in CONEXOES_POR_HOST.items():
+                sessao.mount(prefixo, _novo_adaptador(conexoes))
+
+            _sessao = sessao
+
+        return _sessao
+
+
+def http_get(url, timeout=15, **kwargs):
+
+    try:
+        return obter_sessao().get(url, timeout=timeout, **kwargs)
+    except EmptyPoolError as e:
+        # pool esgotado é transitório: o rate_limiter trata como erro de rede
+        raise requests.ConnectionError(f"sem conexão livre para {url} em {ESPERA_CONEXAO_S}s") from e
+
+
+def estatisticas_http():
+    """Por host: requisições feitas, conexões abertas (handshakes) e reuso."""
+
+    estatisticas = {}
+
+    with _lock:
+        adaptadores = list(_adaptadores)
+
+    for adaptador in adaptadores:
+
+        pools = adaptador.poolmanager.pools
+
+        for chave in list(pools.keys()):
+
+            pool = pools.get(chave)
+
+            if pool is None:
+                continue
+
+            host = f"{pool.scheme}://{pool.host}"
+
+            if pool.port not in (None, 80, 443):
+                host = f"{host}:{pool.port}"
+            atual = estatisticas.setdefault(host, {"requisicoes": 0, "conexoes": 0})
+
+            atual["requisicoes"] += pool.num_requests
+            atual["conexoes"] += pool.num_connections
+
+    return estatisticas
+
+
+def registrar_estatisticas():
+
+    for host, valores in sorted(estatisticas_http().items()):
+
+        requisicoes = valores["requisicoes"]
+        conexoes = valores["conexoes"]
+        reuso = (requisicoes - conexoes) / requisicoes * 100 if requisicoes else 0
+        tipo = "handshakes TLS" if host.startswith("https") else "conexões"
+
+        mensagem = f"HTTP {host}: {requisicoes} requisições, {conexoes} {tipo}, {reuso:.0f}% reuso de conexão"
+
+        print(mensagem)
+        logger.info(mensagem)
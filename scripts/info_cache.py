@@ -0,0 +1,222 @@
+import glob
+import json
+import os
+import threading
+import time
+
+from scripts.issuers import CAMPOS_EMISSOR, raiz_emissor
+from scripts.logger import logger
+
+# =========================
+# CACHE EM DISCO DO YAHOO (.info / fast_info)
+# =========================
+#
+# Um arquivo JSON por ticker em data/cache/info, dividido em camadas.
+# Cada camada tem seu próprio TTL e é renovada inteira quando expira:
+#   preco       -> fast_info (muda todo dia)
+#   fundamental -> múltiplos do .info (mudam devagar)
+#   estatico    -> cadastro da empresa (quase nunca muda)
+#
+# A camada estatico só tem dados da empresa, iguais em todas as classes
+# (BSLI3/BSLI4...). Quando só ela expirou e outra classe da mesma raiz tem
+# a camada válida no disco, ela é copiada (com o carimbo original) e o
+# .info não é pedido. Nome e múltiplos são da classe e ficam em fundamental.
+
+CACHE_DIR = "data/cache/info"
+
+TTL_HORAS = {
+    "preco": 4,
+    "fundamental": 72,
+    "estatico": 24 * 30,
+}
+
+CAMPOS = {
+    "preco": ["lastPrice", "marketCap"],
+    "fundamental": ["shortName", "trailingPE", "priceToBook", "returnOnEquity", "dividendYield"],
+    "estatico": list(CAMPOS_EMISSOR),
+}
+
+_lock = threading.Lock()
+
+_estatisticas = {camada: {"hits": 0, "misses": 0} for camada in CAMPOS}
+_emprestadas = {"estatico": 0}
+
+
+def _caminho(ticker):
+    return os.path.join(CACHE_DIR, f"{ticker}.json")
+
+
+def ler_cache(ticker):
+
+    try:
+        with open(_caminho(ticker), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def salvar_cache(ticker, cache):
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    caminho = _caminho(ticker)
+    temporario = f"{caminho}.tmp"
+
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False)
+
+    os.replace(temporario, caminho)
+
+
+def camada_valida(cache, camada, agora=None):
+
+    agora = agora or time.time()
+
+    entrada = cache.get(camada)
+
+    if not entrada:
+        return False
+
+    return agora - entrada.get("ts", 0) < TTL_HORAS[camada] * 3600
+
+
+def _registrar(camada, hit):
+
+    with _lock:
+        _estatisticas[camada]["hits" if hit else "misses"] += 1
+
+
+def _extrair_campos(origem, camada):
+
+    # só guarda o que veio: chave ausente continua ausente no .get() de quem lê
+    return {
+        campo: origem.get(campo)
+        for campo in CAMPOS[camada]
+        if origem.get(campo) is not None
+    }
+
+
+def _estatico_de_outra_classe(ticker, agora):
+    """Camada estatico válida mais recente de outra classe da mesma empresa, ou None."""
+
+    melhor = None
+
+    for caminho in glob.glob(os.path.join(CACHE_DIR, f"{raiz_emissor(ticker)}*.json")):
+
+        outro = os.path.basename(caminho)[:-len(".json")]
+
+        if outro == ticker:
+            continue
+
+        cache = ler_cache(outro)
+
+        if not camada_valida(cache, "estatico", agora):
+            continue
+
+        # arquivos antigos ainda trazem shortName (da classe) nesta camada
+        dados = _extrair_campos(cache["estatico"]["dados"], "estatico")
+
+        if dados and (melhor is None or cache["estatico"]["ts"] > melhor["ts"]):
+            melhor = {"ts": cache["estatico"]["ts"], "dados": dados}
+
+    return melhor
+
+
+def obter_com_cache(ticker, buscar_precos, buscar_info):
+
+    """
+    Retorna (precos, info) montados a partir do cache, indo à rede
+    só para as camadas expiradas. buscar_precos/buscar_info são chamados
+    com o ticker e devolvem dicionários no formato do yfinance.
+    """
+
+    cache = ler_cache(ticker)
+    agora = time.time()
+    alterado = False
+
+    if camada_valida(cache, "preco", agora):
+        _registrar("preco", True)
+    else:
+        _registrar("preco", False)
+        cache["preco"] = {"ts": agora, "dados": _extrair_campos(buscar_precos(ticker), "preco")}
+        alterado = True
+
+    info_expirada = [c for c in ("fundamental", "estatico") if not camada_valida(cache, c, agora)]
+
+    # só a empresa expirou: outra classe pode poupar a chamada ao .info.
+    # Arquivo antigo, com o shortName ainda em estatico, pede o .info uma vez
+    if info_expirada == ["estatico"] and "shortName" in cache["fundamental"]["dados"]:
+
+        emprestada = _estatico_de_outra_classe(ticker, agora)
+
+        if emprestada:
+            cache["estatico"] = emprestada
+            info_expirada = []
+            alterado = True
+
+            with _lock:
+                _emprestadas["estatico"] += 1
+
+    for camada in ("fundamental", "estatico"):
+        _registrar(camada, camada not in info_expirada)
+
+    if info_expirada:
+
+        info = buscar_info(ticker) or {}
+
+        # o .info traz as duas camadas numa chamada só: renova só as expiradas
+        for camada in info_expirada:
+
+            dados = _extrair_campos(info, camada)
+
+            # resposta vazia ou falha não vale como camada nova: fica a antiga
+            # (mesmo vencida) e a próxima execução tenta de novo
+            if not dados:
+                continue
+
+            cache[camada] = {"ts": agora, "dados": dados}
+            alterado = True
+
+    if alterado:
+        try:
+            salvar_cache(ticker, cache)
+        except Exception as e:
+            logger.warning(f"Falha ao salvar cache de {ticker}: {e}")
+
+    precos = dict(cache["preco"]["dados"])
+    # fundamental por último: o shortName da classe vale sobre o de arquivos antigos
+    info = {
+        **cache.get("estatico", {}).get("dados", {}),
+        **cache.get("fundamental", {}).get("dados", {}),
+    }
+
+    return precos, info
+
+
+def estatisticas_cache():
+
+    with _lock:
+        return {camada: dict(valores) for camada, valores in _estatisticas.items()}
+
+
+def registrar_estatisticas():
+
+    for camada, valores in estatisticas_cache().items():
+
+        total = valores["hits"] + valores["misses"]
+        taxa = valores["hits"] / total * 100 if total else 0
+
+        mensagem = f"Cache .info [{camada}]: {valores['hits']} hits, {valores['misses']} misses ({taxa:.0f}% hit)"
+
+        print(mensagem)
+        logger.info(mensagem)
+
+    with _lock:
+        emprestadas = _emprestadas["estatico"]
+
+    if emprestadas:
+
+        mensagem = f"Cache .info [estatico]: {emprestadas} camadas copiadas de outra classe da mesma empresa, sem pedir o .info"
+
+        print(mensagem)
+        logger.info(mensagem)
@@ -0,0 +1,88 @@
+import threading
+
+from scripts.logger import logger
+
+# =========================
+# REGISTRO DE EMISSORES
+# =========================
+#
+# Classes de ação da mesma empresa (BSLI3/BSLI4, BRSR3/BRSR5/BRSR6...)
+# dividem a raiz do ticker, as quatro primeiras letras. Só o que é da
+# empresa é compartilhado: resumo, setor e site (e, fora daqui, a camada
+# estatico do cache de .info, a tradução do resumo e as notícias, agrupadas
+# pela mesma raiz). Nome, cotação, P/L, P/VP e DY são da classe e vêm
+# sempre do .info do próprio ticker.
+#
+# O registro só recebe .info recém-buscado na rede nesta execução; info
+# lida do cache em disco não entra, para que uma classe não devolva à outra
+# dados velhos com carimbo novo.
+
+CAMPOS_EMISSOR = ("longBusinessSummary", "sector", "website")
+
+_emissores = {}
+_lock = threading.Lock()
+_estatisticas = {"completados": 0}
+
+
+def raiz_emissor(ticker):
+    return ticker[:4]
+
+
+def registrar_emissor(ticker, info):
+    """Guarda os campos da empresa de um .info recém-buscado (a primeira classe fica)."""
+
+    campos = {c: info[c] for c in CAMPOS_EMISSOR if info.get(c)}
+
+    if not campos:
+        return
+
+    with _lock:
+        guardados = _emissores.setdefault(raiz_emissor(ticker), {})
+
+        for campo, valor in campos.items():
+            guardados.setdefault(campo, valor)
+
+
+def completar_com_emissor(ticker, info):
+    """info do ticker com os campos da empresa que vieram vazios preenchidos por outra classe."""
+
+    with _lock:
+        guardados = dict(_emissores.get(raiz_emissor(ticker), {}))
+
+    faltando = {c: v for c, v in guardados.items() if not info.get(c)}
+
+    if not faltando:
+        return info
+
+    with _lock:
+        _estatisticas["completados"] += 1
+
+    return {**info, **faltando}
+
+
+def info_do_emissor(ticker, buscar_info):
+    """.info do próprio ticker, registrado para as outras classes e completado por elas."""
+
+    info = buscar_info(ticker) or {}
+
+    registrar_emissor(ticker, info)
+
+    return completar_com_emissor(ticker, info)
+
+
+def registrar_estatisticas():
+
+    with _lock:
+        completados = _estatisticas["completados"]
+        emissores = len(_emissores)
+
+    if not completados:
+        return
+
+    mensagem = (
+        f"Emissores: {emissores} empresas registradas, "
+        f"{completados} classes completadas com resumo/setor/site de outra classe"
+    )
+
+    print(mensagem)
+    logger.info(mensagem)
@@ -1,54 +1,209 @@
+import datetime
+import filecmp
+import json
 import os
-import requests
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from scripts.rate_limiter import executar, verificar_status
+from scripts.http_client import http_get
+from scripts.logger import logger
 
 BASE_URL = "https://raw.githubusercontent.com/thefintz/icones-b3/main/icones"
 
 CACHE_DIR = "data/logos"
 SITE_DIR = "docs/logos"
 
+# ETag / Last-Modified e data da última checagem de cada logo
+META_ARQUIVO = "data/cache/logos_meta.json"
+
+# logo existente é revalidado (GET condicional) depois de tantos dias
+DIAS_REVALIDAR = 30
+
+# logo que não existe no repositório só é procurado de novo depois disso
+DIAS_AUSENTE = 7
+
+# =========================
+# SINCRONIZAÇÃO DE LOGOS
+# =========================
+#
+# Logos que faltam são baixados em paralelo; os que já temos só são
+# revalidados a cada DIAS_REVALIDAR dias, com GET condicional (ETag /
+# Last-Modified), e um 304 não transfere nada. A cópia para docs/logos é
+# um hardlink do cache e é pulada quando o arquivo do site já é igual.
+
 os.makedirs(CACHE_DIR, exist_ok=True)
 os.makedirs(SITE_DIR, exist_ok=True)
 
+_meta = None
+_lock = threading.Lock()
+
+
+def _carregar_meta():
+
+    global _meta
+
+    if _meta is None:
+        try:
+            with open(META_ARQUIVO, "r", encoding="utf-8") as f:
+                _meta = json.load(f)
+        except Exception:
+            _meta = {}
+
+    return _meta
+
+
+def _salvar_meta():
+
+    with _lock:
+        meta = dict(_carregar_meta())
+
+    os.makedirs(os.path.dirname(META_ARQUIVO), exist_ok=True)
+
+    with open(META_ARQUIVO, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2, sort_keys=True)
+
+
+def _checado_ha_menos_de(entrada, dias):
+
+    checado = entrada.get("checado")
+
+    if not checado:
+        return False
+
+    return datetime.date.fromisoformat(checado) > datetime.date.today() - datetime.timedelta(days=dias)
+
+
+def _publicar(cache_path, site_path):
+    """Leva o logo do cache para o site: hardlink quando possível, nada se já for igual."""
+
+    if os.path.exists(site_path):
+
+        if os.path.samefile(cache_path, site_path) or filecmp.cmp(cache_path, site_path, shallow=True):
+            return "inalterado"
+
+        os.remove(site_path)
+
+    try:
+        os.link(cache_path, site_path)
+    except OSError:
+        # sistema de arquivos sem hardlink ou em outro dispositivo
+        shutil.copy2(cache_path, site_path)
+
+    return "publicado"
 
-def baixar_logo(ticker):
 
-    
+def _gravar(cache_path, conteudo):
+
+    # arquivo novo + replace: o hardlink antigo do site não é alterado por baixo
+    temporario = f"{cache_path}.tmp"
+
+    with open(temporario, "wb") as f:
+        f.write(conteudo)
+
+    os.replace(temporario, cache_path)
+
+
+def sincronizar_logo(ticker, dias_revalidar=DIAS_REVALIDAR):
+
     url = f"{BASE_URL}/{ticker}.png"
 
     cache_path = f"{CACHE_DIR}/{ticker}.png"
     site_path = f"{SITE_DIR}/{ticker}.png"
 
-    # se já existe no cache não baixa novamente
-    if os.path.exists(cache_path):
+    with _lock:
+        entrada = dict(_carregar_meta().get(ticker, {}))
+
+    existe = os.path.exists(cache_path)
+
+    # logo baixado antes dos metadados existirem: conta a data do arquivo
+    if existe and "checado" not in entrada:
+        entrada["checado"] = datetime.date.fromtimestamp(os.path.getmtime(cache_path)).isoformat()
 
-        if not os.path.exists(site_path):
-            with open(cache_path, "rb") as src:
-                with open(site_path, "wb") as dst:
-                    dst.write(src.read())
+    if existe and _checado_ha_menos_de(entrada, dias_revalidar):
+        return "em_dia", _publicar(cache_path, site_path)
 
-        return site_path
+    if not existe and entrada.get("ausente") and _checado_ha_menos_de(entrada, DIAS_AUSENTE):
+        return "ausente", None
+
+    cabecalhos = {}
+
+    # só manda validadores se ainda temos o arquivo a que eles se referem
+    if existe:
+        if entrada.get("etag"):
+            cabecalhos["If-None-Match"] = entrada["etag"]
+        if entrada.get("last_modified"):
+            cabecalhos["If-Modified-Since"] = entrada["last_modified"]
 
     try:
+        response = executar(
+            "github_logos",
+            lambda: verificar_status(http_get(url, timeout=10, headers=cabecalhos)),
+            chave=url
+        )
+    except Exception:
+        return "erro", _publicar(cache_path, site_path) if existe else None
 
-        response = requests.get(url, timeout=10)
+    hoje = datetime.date.today().isoformat()
 
-        if response.status_code == 200:
+    if response.status_code == 304:
+        estado = "revalidado"
 
-            with open(cache_path, "wb") as f:
-                f.write(response.content)
+    elif response.status_code == 200:
+        _gravar(cache_path, response.content)
+        entrada["etag"] = response.headers.get("ETag")
+        entrada["last_modified"] = response.headers.get("Last-Modified")
+        entrada.pop("ausente", None)
+        estado = "atualizado" if existe else "baixado"
 
-            with open(site_path, "wb") as f:
-                f.write(response.content)
+    else:
+        entrada["ausente"] = not existe
+        estado = "ausente" if not existe else "erro"
 
-            return site_path
+    entrada["checado"] = hoje
 
-    except:
-        pass
+    with _lock:
+        _carregar_meta()[ticker] = entrada
 
-    return None
+    if not os.path.exists(cache_path):
+        return estado, None
 
+    return estado, _publicar(cache_path, site_path)
 
-def preparar_logos(df):
 
-    for ticker in df["Ticker"]:
-        baixar_logo(ticker)
\ No newline at end of file
+def baixar_logo(ticker):
+
+    sincronizar_logo(ticker)
+
+    site_path = f"{SITE_DIR}/{ticker}.png"
+
+    return site_path if os.path.exists(site_path) else None
+
+
+def sincronizar_logos(tickers, max_workers=8, dias_revalidar=DIAS_REVALIDAR):
+
+    tickers = list(dict.fromkeys(tickers))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        resultados = list(executor.map(lambda t: sincronizar_logo(t, dias_revalidar), tickers))
+
+    _salvar_meta()
+
+    contagem = {}
+
+    for estado, publicacao in resultados:
+        contagem[estado] = contagem.get(estado, 0) + 1
+        if publicacao:
+            contagem[publicacao] = contagem.get(publicacao, 0) + 1
+
+    mensagem = "Logos: " + ", ".join(f"{n} {estado}" for estado, n in sorted(contagem.items()))
+
+    print(mensagem)
+    logger.info(mensagem)
+
+    return contagem
+
+
+def preparar_logos(df):
+    return sincronizar_logos(df["Ticker"])
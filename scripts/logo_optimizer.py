@@ -0,0 +1,176 @@
+import hashlib
+import json
+import math
+import os
+
+from scripts.logger import logger
+from scripts.logo_manager import SITE_DIR
+
+try:
+    from PIL import Image
+except ImportError:
+    # sem Pillow as páginas continuam usando o PNG original de cada logo
+    Image = None
+
+# =========================
+# LOGOS OTIMIZADOS PARA LISTAS
+# =========================
+#
+# As listas de ranking mostram o logo com 20-28px, mas carregavam o PNG
+# original de cada linha. Aqui os logos são reduzidos (com o dobro da
+# resolução, para telas retina) e montados numa sprite por tamanho, em WebP
+# e PNG, com um CSS de deslocamentos: uma lista inteira passa a custar uma
+# imagem só. Nada é refeito se os logos de origem não mudaram.
+
+TAMANHOS = (20, 28)
+
+# pixels da imagem por pixel CSS
+DENSIDADE = 2
+
+COLUNAS_SPRITE = 16
+
+_mapas = {}
+
+
+def _caminho(nome):
+    return os.path.join(SITE_DIR, nome)
+
+
+def _assinatura(tickers):
+
+    # pelo conteúdo, não pela data: o checkout do CI muda a data de tudo
+    resumo = hashlib.sha1()
+
+    for ticker in tickers:
+        with open(_caminho(f"{ticker}.png"), "rb") as f:
+            resumo.update(ticker.encode() + b"\0" + hashlib.sha1(f.read()).digest())
+
+    return resumo.hexdigest()
+
+
+def _miniatura(origem, lado):
+
+    imagem = origem.convert("RGBA")
+    imagem.thumbnail((lado, lado), Image.LANCZOS)
+
+    # centraliza num quadrado transparente: logos não quadrados não distorcem
+    quadro = Image.new("RGBA", (lado, lado), (0, 0, 0, 0))
+    quadro.paste(imagem, ((lado - imagem.width) // 2, (lado - imagem.height) // 2))
+
+    return quadro
+
+
+def _gerar_tamanho(tickers, tamanho, assinatura):
+
+    lado = tamanho * DENSIDADE
+
+    colunas = min(COLUNAS_SPRITE, len(tickers))
+    linhas = math.ceil(len(tickers) / colunas)
+
+    sprite = Image.new("RGBA", (colunas * lado, linhas * lado), (0, 0, 0, 0))
+    posicoes = {}
+
+    for i, ticker in enumerate(tickers):
+
+        try:
+            with Image.open(_caminho(f"{ticker}.png")) as origem:
+                miniatura = _miniatura(origem, lado)
+        except Exception as e:
+            logger.warning(f"Logo {ticker} ignorado na otimização: {e}")
+            continue
+
+        x, y = (i % colunas) * lado, (i // colunas) * lado
+        sprite.paste(miniatura, (x, y))
+        posicoes[ticker] = [x // DENSIDADE, y // DENSIDADE]
+
+    # PNG de paleta: fallback para navegador sem WebP, bem menor que RGBA
+    sprite.quantize(256, method=Image.Quantize.FASTOCTREE).save(_caminho(f"sprite-{tamanho}.png"), optimize=True)
+    sprite.save(_caminho(f"sprite-{tamanho}.webp"), quality=70, method=6)
+
+    largura, altura = colunas * tamanho, linhas * tamanho
+
+    regras = [
+        f".logo-{tamanho}{{display:inline-block;flex:none;width:{tamanho}px;height:{tamanho}px;"
+        f"background-image:url(sprite-{tamanho}.png);"
+        f"background-image:image-set(url(sprite-{tamanho}.webp) type(\"image/webp\"),url(sprite-{tamanho}.png) type(\"image/png\"));"
+        f"background-size:{largura}px {altura}px;background-repeat:no-repeat}}"
+    ]
+
+    regras += [
+        f".logo-{tamanho}.l-{ticker}{{background-position:-{x}px -{y}px}}"
+        for ticker, (x, y) in posicoes.items()
+    ]
+
+    with open(_caminho(f"sprite-{tamanho}.css"), "w", encoding="utf-8") as f:
+        f.write("\n".join(regras) + "\n")
+
+    mapa = {"assinatura": assinatura, "posicoes": posicoes}
+
+    with open(_caminho(f"sprite-{tamanho}.json"), "w", encoding="utf-8") as f:
+        json.dump(mapa, f, sort_keys=True)
+
+    return mapa
+
+
+def _carregar_mapa(tamanho):
+    try:
+        with open(_caminho(f"sprite-{tamanho}.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def otimizar_logos(tickers, tamanhos=TAMANHOS):
+    """Gera as sprites dos logos disponíveis; devolve {tamanho: {ticker: [x, y]}}."""
+
+    if Image is None:
+        logger.warning("Pillow não instalado: logos otimizados não gerados, listas usam o PNG original")
+        return {}
+
+    disponiveis = sorted(t for t in set(tickers) if os.path.exists(_caminho(f"{t}.png")))
+
+    if not disponiveis:
+        return {}
+
+    assinatura = _assinatura(disponiveis)
+    gerados = 0
+
+    for tamanho in tamanhos:
+
+        mapa = _carregar_mapa(tamanho)
+
+        if mapa is None or mapa.get("assinatura") != assinatura or not os.path.exists(_caminho(f"sprite-{tamanho}.css")):
+            mapa = _gerar_tamanho(disponiveis, tamanho, assinatura)
+            gerados += 1
+
+        _mapas[tamanho] = mapa["posicoes"]
+
+    mensagem = f"Logos otimizados: {len(disponiveis)} logos, {gerados} de {len(tamanhos)} sprites refeitas"
+
+    print(mensagem)
+    logger.info(mensagem)
+
+    return dict(_mapas)
+
+
+def css_logos(tamanho, prefixo="../"):
+    """<link> da sprite do tamanho; vazio se ela não foi gerada nesta execução."""
+
+    if tamanho not in _mapas:
+        return ""
+
+    return f'<link rel="stylesheet" href="{prefixo}logos/sprite-{tamanho}.css">'
+
+
+def html_logo(ticker, empresa, tamanho=28, prefixo="../"):
+    """Logo da lista: recorte da sprite quando existe, senão o PNG original com fallback."""
+
+    if ticker in _mapas.get(tamanho, {}):
+        return f'<span class="logo-{tamanho} l-{ticker}" role="img" aria-label="Logo {empresa}"></span>'
+
+    return (
+        f'<img src="{prefixo}logos/{ticker}.png" alt="Logo {empresa}" loading="lazy" '
+        f'width="{tamanho}" height="{tamanho}" '
+        f'onerror="this.onerror=null;this.src=\'{prefixo}logos/default.svg\';" '
+        f'style="width:{tamanho}px;height:{tamanho}px;object-fit:contain">'
+    )
@@ -0,0 +1,191 @@
+import os
+import threading
+
+import pandas as pd
+import yfinance as yf
+
+from scripts.rate_limiter import executar, verificar_status
+from scripts.http_client import http_get
+
+# =========================
+# PACOTE DE MERCADO POR TICKER
+# =========================
+#
+# Um objeto por ticker por execução, compartilhado entre a coleta, a página
+# da ação, as notícias e o calendário de dividendos. Cada dado (info,
+# fast_info, dividendos, notícias) vai à rede no máximo uma vez; falhas não
+# ficam guardadas, para que quem chamou possa tentar de novo.
+
+
+# vazio = Yahoo real via yfinance; com valor = endpoints JSON nesse host
+# (ex.: scripts/servidor_simulado.py em testes de carga)
+YAHOO_BASE_URL = os.environ.get("YAHOO_BASE_URL", "")
+
+
+def _yahoo_json(caminho, params=None):
+    response = verificar_status(http_get(f"{YAHOO_BASE_URL}{caminho}", params=params, timeout=15))
+    response.raise_for_status()
+    return response.json()
+
+
+def _valor(v):
+    # quoteSummary embrulha números em {"raw": ..., "fmt": ...}
+    return v.get("raw") if isinstance(v, dict) and "raw" in v else v
+
+
+class _YahooHttp:
+    """Cliente mínimo dos endpoints JSON do Yahoo, com a mesma interface do yf.Ticker usada aqui."""
+
+    MODULOS = "price,summaryDetail,defaultKeyStatistics,financialData,assetProfile"
+
+    def __init__(self, ticker):
+        self.simbolo = f"{ticker}.SA"
+
+    @property
+    def info(self):
+
+        dados = _yahoo_json(f"/v10/finance/quoteSummary/{self.simbolo}", {"modules": self.MODULOS})
+
+        resultado = (dados.get("quoteSummary", {}).get("result") or [{}])[0]
+
+        info = {}
+
+        for modulo in resultado.values():
+            if isinstance(modulo, dict):
+                info.update({campo: _valor(v) for campo, v in modulo.items()})
+
+        return info
+
+    @property
+    def fast_info(self):
+
+        dados = _yahoo_json("/v7/finance/quote", {"symbols": self.simbolo})
+
+        cotacao = (dados.get("quoteResponse", {}).get("result") or [{}])[0]
+
+        return {
+            "lastPrice": cotacao.get("regularMarketPrice"),
+            "marketCap": cotacao.get("marketCap"),
+        }
+
+    @property
+    def dividends(self):
+        return self.dividendos_desde(None)
+
+    def dividendos_desde(self, inicio):
+
+        params = {"interval": "1mo", "events": "div"}
+
+        if inicio is None:
+            params["range"] = "max"
+        else:
+            params["period1"] = int(pd.Timestamp(inicio, tz="UTC").timestamp())
+            params["period2"] = int(pd.Timestamp.now(tz="UTC").timestamp())
+
+        dados = _yahoo_json(f"/v8/finance/chart/{self.simbolo}", params)
+
+        resultado = (dados.get("chart", {}).get("result") or [{}])[0]
+        eventos = resultado.get("events", {}).get("dividends", {})
+
+        serie = pd.Series(
+            {
+                pd.Timestamp(e["date"], unit="s", tz="UTC").tz_convert("America/Sao_Paulo"): e["amount"]
+                for e in eventos.values()
+            },
+            dtype=float,
+            name="Dividends",
+        )
+
+        return serie.sort_index()
+
+    @property
+    def news(self):
+        return _yahoo_json("/v1/finance/search", {"q": self.simbolo, "newsCount": 8}).get("news", [])
+
+
+class PacoteMercado:
+
+    def __init__(self, ticker):
+        self.ticker = ticker
+        self._yf = _YahooHttp(ticker) if YAHOO_BASE_URL else yf.Ticker(f"{ticker}.SA")
+        self._dados = {}
+        self._lock = threading.Lock()
+
+    def _carregar(self, campo, buscar):
+
+        with self._lock:
+
+            if campo not in self._dados:
+                self._dados[campo] = executar("yahoo", buscar, chave=f"{campo}:{self.ticker}")
+
+            return self._dados[campo]
+
+    @property
+    def info(self):
+        return self._carregar("info", lambda: self._yf.info or {})
+
+    @property
+    def fast_info(self):
+
+        def buscar():
+            fast = self._yf.fast_info
+            return {
+                "lastPrice": fast.get("lastPrice"),
+                "marketCap": fast.get("marketCap"),
+            }
+
+        return self._carregar("fast_info", buscar)
+
+    @property
+    def dividends(self):
+        return self._carregar("dividends", lambda: self._yf.dividends)
+
+    def dividendos_desde(self, inicio):
+        """Só os proventos com data a partir de `inicio` (date); sem baixar o histórico todo."""
+
+        if "dividends" in self._dados:
+            serie = self._dados["dividends"]
+
+            if serie is None or serie.empty:
+                return serie
+
+            return serie[serie.index >= pd.Timestamp(inicio, tz=getattr(serie.index, "tz", None))]
+
+        def buscar():
+
+            if isinstance(self._yf, _YahooHttp):
+                return self._yf.dividendos_desde(inicio)
+
+            historico = self._yf.history(start=inicio, interval="1d", actions=True, auto_adjust=False)
+
+            if historico.empty or "Dividends" not in historico:
+                return pd.Series(dtype=float, name="Dividends")
+
+            divs = historico["Dividends"]
+            return divs[divs > 0]
+
+        return self._carregar(f"dividends_desde:{inicio}", buscar)
+
+    @property
+    def news(self):
+        return self._carregar("news", lambda: self._yf.news or [])
+
+
+_pacotes = {}
+_lock = threading.Lock()
+
+
+def obter_pacote(ticker):
+
+    with _lock:
+
+        if ticker not in _pacotes:
+            _pacotes[ticker] = PacoteMercado(ticker)
+
+        return _pacotes[ticker]
+
+
+def limpar_pacotes():
+
+    with _lock:
+        _pacotes.clear()
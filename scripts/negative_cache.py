@@ -0,0 +1,96 @@
+import datetime
+import json
+import os
+import threading
+
+from scripts.logger import logger
+
+# =========================
+# CACHE NEGATIVO DE TICKERS
+# =========================
+#
+# Tickers que a brapi lista mas o Yahoo devolve sem preço ou sem market cap
+# (deslistados, sem negociação...) ficam de fora da coleta por alguns dias.
+# Ao expirar, o ticker é sondado de novo; se continuar vazio, o prazo dobra.
+
+ARQUIVO = "data/cache/negativos.json"
+
+DIAS_BASE = 3
+DIAS_MAXIMO = 30
+
+SEM_PRECO = "sem_preco"
+SEM_MARKET_CAP = "sem_market_cap"
+
+_negativos = None
+_lock = threading.Lock()
+
+
+def _carregar():
+
+    global _negativos
+
+    if _negativos is None:
+        try:
+            with open(ARQUIVO, "r", encoding="utf-8") as f:
+                _negativos = json.load(f)
+        except Exception:
+            _negativos = {}
+
+    return _negativos
+
+
+def salvar_negativos():
+
+    with _lock:
+        negativos = dict(_carregar())
+
+    os.makedirs(os.path.dirname(ARQUIVO), exist_ok=True)
+
+    with open(ARQUIVO, "w", encoding="utf-8") as f:
+        json.dump(negativos, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def registrar_negativo(ticker, motivo):
+
+    hoje = datetime.date.today()
+
+    with _lock:
+
+        negativos = _carregar()
+        entrada = negativos.get(ticker, {})
+
+        falhas = entrada.get("falhas", 0) + 1
+        dias = min(DIAS_MAXIMO, DIAS_BASE * 2 ** (falhas - 1))
+
+        negativos[ticker] = {
+            "motivo": motivo,
+            "desde": entrada.get("desde", hoje.isoformat()),
+            "expira": (hoje + datetime.timedelta(days=dias)).isoformat(),
+            "falhas": falhas,
+        }
+
+
+def limpar_negativo(ticker):
+
+    with _lock:
+        _carregar().pop(ticker, None)
+
+
+def filtrar_negativados(tickers):
+    """Remove os tickers com entrada ainda válida; os expirados voltam para nova sondagem."""
+
+    hoje = datetime.date.today().isoformat()
+
+    with _lock:
+        negativos = _carregar()
+        ativos = {t for t, e in negativos.items() if e.get("expira", "") > hoje}
+
+    restantes = [t for t in tickers if t not in ativos]
+
+    pulados = len(tickers) - len(restantes)
+
+    if pulados:
+        print(f"Cache negativo: {pulados} tickers sem preço/market cap pulados.")
+        logger.info(f"Cache negativo: {pulados} tickers pulados, {len(restantes)} seguem para a coleta.")
+
+    return restantes
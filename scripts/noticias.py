@@ -0,0 +1,622 @@
+import datetime
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from html import unescape
+from urllib.parse import quote
+from xml.etree import ElementTree
+
+import feedparser
+
+from scripts.logger import logger
+from scripts.market_bundle import obter_pacote
+from scripts.rate_limiter import executar, medindo, verificar_status
+from scripts.http_client import http_get
+from scripts.issuers import raiz_emissor
+
+# =========================
+# NOTÍCIAS (PT-BR + FALLBACK)
+# =========================
+
+# aponta para o servidor simulado em testes de carga
+GOOGLE_NEWS_BASE_URL = os.environ.get("GOOGLE_NEWS_BASE_URL", "https://news.google.com")
+
+
+# =========================
+# RSS CONDICIONAL E INCREMENTAL
+# =========================
+#
+# Cada feed guarda ETag / Last-Modified e as notícias que rendeu em
+# data/cache/rss_validadores.json. A próxima busca manda esses validadores;
+# um 304 devolve as notícias guardadas sem baixar nem parsear nada. Num 200
+# o XML é parseado em streaming e o parse para no item `limite`.
+
+VALIDADORES_ARQUIVO = "data/cache/rss_validadores.json"
+
+# feed não consultado há tanto tempo sai do arquivo
+DIAS_VALIDADOR = 30
+
+# formato das notícias guardadas (validadores e cache por emissor): 2 = texto
+# puro, escapado só na renderização; entradas antigas são ignoradas
+FORMATO = 2
+
+_validadores = None
+_estatisticas_rss = {"revalidados": 0, "baixados": 0}
+_lock_rss = threading.Lock()
+
+
+def _carregar_validadores():
+
+    global _validadores
+
+    if _validadores is None:
+        try:
+            with open(VALIDADORES_ARQUIVO, "r", encoding="utf-8") as f:
+                _validadores = {
+                    url: entrada
+                    for url, entrada in json.load(f).items()
+                    if entrada.get("formato") == FORMATO
+                }
+        except Exception:
+            _validadores = {}
+
+    return _validadores
+
+
+def salvar_validadores():
+
+    limite = time.time() - DIAS_VALIDADOR * 86400
+
+    with _lock_rss:
+        validadores = {
+            url: entrada
+            for url, entrada in _carregar_validadores().items()
+            if entrada.get("ts", 0) >= limite
+        }
+
+    os.makedirs(os.path.dirname(VALIDADORES_ARQUIVO), exist_ok=True)
+
+    temporario = f"{VALIDADORES_ARQUIVO}.tmp"
+
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(validadores, f, ensure_ascii=False)
+
+    os.replace(temporario, VALIDADORES_ARQUIVO)
+
+
+def _texto(html):
+    """Texto puro: a descrição do Google News vem em HTML. O escape fica para quem renderiza."""
+    return " ".join(unescape(re.sub(r"<[^>]+>", " ", html)).split())
+
+
+def _noticia_do_item(item):
+
+    return {
+        "titulo": item.findtext("title") or "",
+        "resumo": _texto(item.findtext("description") or ""),
+        "link": item.findtext("link") or "",
+        "fonte": item.findtext("source") or "Google News",
+        "data": (item.findtext("pubDate") or "")[:10],
+    }
+
+
+def _noticias_do_feedparser(conteudo, limite):
+
+    feed = feedparser.parse(conteudo)
+
+    noticias = []
+    for entry in feed.entries[:limite]:
+        noticias.append({
+            "titulo": entry.title,
+            "resumo": _texto(entry.summary) if hasattr(entry, "summary") else "",
+            "link": entry.link,
+            "fonte": entry.source.title if hasattr(entry, "source") else "Google News",
+            "data": entry.published[:10] if hasattr(entry, "published") else ""
+        })
+
+    return noticias
+
+
+def ler_itens(pedacos, limite):
+    """Parseia o RSS em streaming e para no item `limite`."""
+
+    parser = ElementTree.XMLPullParser(events=("end",))
+    lidos = []
+    noticias = []
+
+    for pedaco in pedacos:
+
+        lidos.append(pedaco)
+
+        try:
+            parser.feed(pedaco)
+
+            for _, elemento in parser.read_events():
+                if elemento.tag == "item":
+                    noticias.append(_noticia_do_item(elemento))
+                    elemento.clear()
+
+        except ElementTree.ParseError:
+            # XML fora do padrão RSS simples: feedparser no documento inteiro
+            return _noticias_do_feedparser(b"".join(lidos) + b"".join(pedacos), limite)
+
+        if len(noticias) >= limite:
+            break
+
+    return noticias[:limite]
+
+
+def baixar_feed(url, limite=4):
+    """GET condicional + parse incremental; 429/5xx viram exceção para o rate limiter."""
+
+    with _lock_rss:
+        anterior = _carregar_validadores().get(url)
+
+    cabecalhos = {}
+
+    if anterior:
+        if anterior.get("etag"):
+            cabecalhos["If-None-Match"] = anterior["etag"]
+        if anterior.get("last_modified"):
+            cabecalhos["If-Modified-Since"] = anterior["last_modified"]
+
+    response = http_get(url, timeout=15, headers=cabecalhos, stream=True)
+
+    # stream=True: a conexão só volta ao pool quando a resposta é fechada,
+    # então o with vem antes de qualquer exceção (429/5xx inclusive)
+    with response:
+
+        verificar_status(response)
+
+        if response.status_code == 304 and anterior:
+            with _lock_rss:
+                anterior["ts"] = time.time()
+                _estatisticas_rss["revalidados"] += 1
+            return anterior["noticias"][:limite]
+
+        response.raise_for_status()
+
+        pedacos = response.iter_content(chunk_size=8192)
+        noticias = ler_itens(pedacos, limite)
+
+        # o resto do corpo é lido sem parsear: a conexão volta para o pool
+        for _ in pedacos:
+            pass
+
+    with _lock_rss:
+        _estatisticas_rss["baixados"] += 1
+
+        # feed sem validador não teria como responder 304: não é guardado
+        if response.headers.get("ETag") or response.headers.get("Last-Modified"):
+            _carregar_validadores()[url] = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "noticias": noticias,
+                "ts": time.time(),
+                "formato": FORMATO,
+            }
+
+    return noticias
+
+
+def obter_noticias_google(ticker, empresa, limite=4):
+    """Busca notícias em português via Google News RSS"""
+    try:
+        query = quote(f"{empresa} {ticker}")
+        url = f"{GOOGLE_NEWS_BASE_URL}/rss/search?q={query}&hl=pt-BR&gl=BR&ceid=BR:pt-419"
+
+        return executar("google_news", baixar_feed, url, limite, chave=url)
+
+    except Exception:
+        return []
+
+
+def obter_noticias_yahoo(ticker, limite=4, traduzir=None, cancelado=None):
+    """Fallback usando Yahoo Finance + tradução"""
+    try:
+        noticias = obter_pacote(ticker).news
+        resultado = []
+
+        for n in noticias[:limite]:
+            content = n.get("content", n)
+
+            titulo = content.get("title") or ""
+            resumo = (
+                content.get("summary")
+                or content.get("description")
+                or ""
+            )
+
+            link = (
+                (content.get("canonicalUrl") or {}).get("url")
+                or n.get("link")
+                or "#"
+            )
+
+            ts = content.get("pubDate") or n.get("providerPublishTime")
+
+            try:
+                if isinstance(ts, (int, float)):
+                    data_pub = datetime.datetime.fromtimestamp(ts).strftime("%d/%m/%Y")
+                else:
+                    data_pub = ""
+            except Exception:
+                data_pub = ""
+
+            if titulo and link:
+                resultado.append({
+                    "titulo": titulo,
+                    "resumo": resumo,
+                    "link": link,
+                    "fonte": "Yahoo Finance",
+                    "data": data_pub,
+                })
+
+        # disputa perdida no modo hedge: não gasta tradução à toa
+        if cancelado is not None and cancelado.is_set():
+            return []
+
+        # títulos e resumos vão juntos para a tradução: traduzir(textos)
+        # devolve {original: tradução} e o que faltar fica no original
+        if traduzir and resultado:
+            traducoes = traduzir([n["titulo"] for n in resultado] + [n["resumo"] for n in resultado])
+
+            for n in resultado:
+                n["titulo"] = traducoes.get(n["titulo"], n["titulo"])
+                n["resumo"] = traducoes.get(n["resumo"], n["resumo"])
+
+        return resultado
+
+    except Exception:
+        return []
+
+
+def obter_noticias(ticker, empresa, limite=4, traduzir=None):
+    """Prioriza português → fallback traduzido"""
+
+    # 1️⃣ Google News (PT-BR)
+    noticias = _medir("google", None, obter_noticias_google, ticker, empresa, limite)
+
+    if noticias:
+        return noticias
+
+    # 2️⃣ Fallback Yahoo
+    return _medir("yahoo", None, obter_noticias_yahoo, ticker, limite, traduzir)
+
+
+# =========================
+# MODO HEDGE (GOOGLE x YAHOO)
+# =========================
+#
+# Em vez de esperar o Google responder vazio para só então ir ao Yahoo,
+# o Yahoo é disparado quando o Google passa do percentil HEDGE_PERCENTIL
+# das latências já observadas dele. Vale o primeiro resultado com
+# notícias; o outro é descartado. Com poucas amostras usa um atraso fixo.
+# Latência aqui é só a da requisição HTTP: a espera pelo token do
+# rate_limiter não entra nem no percentil nem no relógio do hedge.
+
+HEDGE_PERCENTIL = float(os.environ.get("NOTICIAS_HEDGE_PERCENTIL", 90))
+
+HEDGE_ATRASO_INICIAL_S = 1.0
+HEDGE_MIN_AMOSTRAS = 20
+
+# limites das faixas do histograma, em segundos
+FAIXAS_LATENCIA = (0.1, 0.25, 0.5, 1, 2, 5)
+
+_latencias = {"google": [], "yahoo": []}
+_vitorias = {"google": 0, "yahoo": 0, "nenhuma": 0, "hedges": 0}
+_lock_latencias = threading.Lock()
+
+_executor_hedge = ThreadPoolExecutor(max_workers=16)
+
+
+# host do rate_limiter de cada fonte
+HOSTS = {"google": "google_news", "yahoo": "yahoo"}
+
+
+def _medir(fonte, iniciado, buscar, *args):
+    """
+    Roda buscar(*args) guardando a latência só das requisições HTTP da
+    fonte: a espera pelo token e o backoff do rate_limiter ficam de fora.
+    `iniciado` (Event ou None) é marcado quando a requisição sai ou quando
+    buscar termina sem ir à rede (cache, replay, circuito aberto).
+    """
+
+    def terminou(duracao):
+        with _lock_latencias:
+            _latencias[fonte].append(duracao)
+
+    try:
+        with medindo(HOSTS[fonte], iniciado.set if iniciado else None, terminou):
+            return buscar(*args)
+    finally:
+        if iniciado:
+            iniciado.set()
+
+
+def percentil_latencia(fonte, percentil):
+
+    with _lock_latencias:
+        amostras = sorted(_latencias[fonte])
+
+    if not amostras:
+        return None
+
+    posicao = min(len(amostras) - 1, int(len(amostras) * percentil / 100))
+
+    return amostras[posicao]
+
+
+def atraso_hedge(percentil=None):
+    """Quanto esperar o Google antes de disparar o Yahoo."""
+
+    with _lock_latencias:
+        amostras = len(_latencias["google"])
+
+    if amostras < HEDGE_MIN_AMOSTRAS:
+        return HEDGE_ATRASO_INICIAL_S
+
+    return percentil_latencia("google", HEDGE_PERCENTIL if percentil is None else percentil)
+
+
+def _contar(chave):
+    with _lock_latencias:
+        _vitorias[chave] += 1
+
+
+def obter_noticias_hedge(ticker, empresa, limite=4, traduzir=None, percentil=None):
+    """Google e Yahoo em disputa: o Yahoo entra se o Google demorar além do percentil."""
+
+    cancelado = threading.Event()
+    iniciado = threading.Event()
+
+    google = _executor_hedge.submit(_medir, "google", iniciado, obter_noticias_google, ticker, empresa, limite)
+    futuros = {google: "google"}
+
+    # o atraso conta de quando a requisição ao Google sai, não da fila pelo token
+    iniciado.wait()
+
+    try:
+        google.result(timeout=atraso_hedge(percentil))
+    except Exception:
+        pass
+
+    if google.done() and google.result():
+        _contar("google")
+        return google.result()
+
+    if not google.done():
+        _contar("hedges")
+
+    yahoo = _executor_hedge.submit(_medir, "yahoo", None, obter_noticias_yahoo, ticker, limite, traduzir, cancelado)
+    futuros[yahoo] = "yahoo"
+
+    pendentes = set(futuros)
+
+    while pendentes:
+
+        prontos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+
+        for futuro in prontos:
+
+            noticias = futuro.result()
+
+            if noticias:
+                # o perdedor não tem como ser interrompido no meio da
+                # requisição; só é avisado e seu resultado ignorado
+                cancelado.set()
+                for outro in pendentes:
+                    outro.cancel()
+
+                _contar(futuros[futuro])
+                return noticias
+
+    _contar("nenhuma")
+    return []
+
+
+def registrar_estatisticas():
+
+    with _lock_latencias:
+        latencias = {fonte: sorted(valores) for fonte, valores in _latencias.items()}
+        vitorias = dict(_vitorias)
+
+    with _lock_rss:
+        rss = dict(_estatisticas_rss)
+
+    if rss["revalidados"] or rss["baixados"]:
+
+        mensagem = f"Feeds RSS: {rss['revalidados']} inalterados (304), {rss['baixados']} baixados"
+
+        print(mensagem)
+        logger.info(mensagem)
+
+    for fonte, valores in latencias.items():
+
+        if not valores:
+            continue
+
+        contagem = [0] * (len(FAIXAS_LATENCIA) + 1)
+
+        for valor in valores:
+            contagem[sum(valor >= limite for limite in FAIXAS_LATENCIA)] += 1
+
+        rotulos = [f"<{limite}s" for limite in FAIXAS_LATENCIA] + [f">={FAIXAS_LATENCIA[-1]}s"]
+        faixas = " ".join(f"{rotulo}:{n}" for rotulo, n in zip(rotulos, contagem))
+
+        p50, p90, p99 = (percentil_latencia(fonte, p) for p in (50, 90, 99))
+
+        mensagem = (
+            f"Latência notícias {fonte}: {len(valores)} chamadas, "
+            f"p50 {p50:.2f}s p90 {p90:.2f}s p99 {p99:.2f}s | {faixas}"
+        )
+
+        print(mensagem)
+        logger.info(mensagem)
+
+    if vitorias["hedges"] or vitorias["yahoo"]:
+
+        mensagem = (
+            f"Notícias (hedge): {vitorias['google']} Google, {vitorias['yahoo']} Yahoo, "
+            f"{vitorias['nenhuma']} sem resultado, {vitorias['hedges']} disparos por atraso"
+        )
+
+        print(mensagem)
+        logger.info(mensagem)
+
+
+# =========================
+# PRÉ-BUSCA DE NOTÍCIAS
+# =========================
+#
+# As notícias de todos os tickers são buscadas em paralelo, numa etapa em
+# segundo plano iniciada antes da geração do site. Cada resultado fica em
+# data/cache/noticias com TTL: notícia buscada há poucas horas é reutilizada
+# sem rede. Na renderização só se lê o que já está pronto; ticker cuja
+# busca não terminou usa o cache vencido, ou fica sem notícias. A busca e o
+# cache são por empresa (raiz do ticker), não por classe de ação.
+
+CACHE_DIR = "data/cache/noticias"
+
+TTL_HORAS = 6
+
+# ticker sem notícia nenhuma é consultado de novo mais cedo
+TTL_VAZIO_HORAS = 2
+
+
+def _caminho(ticker):
+    return os.path.join(CACHE_DIR, f"{ticker}.json")
+
+
+def ler_cache(ticker):
+
+    try:
+        with open(_caminho(ticker), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def salvar_cache(ticker, noticias):
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    caminho = _caminho(ticker)
+    temporario = f"{caminho}.tmp"
+
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump({"ts": time.time(), "noticias": noticias, "formato": FORMATO}, f, ensure_ascii=False)
+
+    os.replace(temporario, caminho)
+
+
+def cache_valido(entrada, agora=None):
+
+    if not entrada or entrada.get("formato") != FORMATO:
+        return False
+
+    agora = agora or time.time()
+    ttl = TTL_HORAS if entrada.get("noticias") else TTL_VAZIO_HORAS
+
+    return agora - entrada.get("ts", 0) < ttl * 3600
+
+
+class EtapaNoticias:
+
+    def __init__(self, buscar=obter_noticias, max_workers=8, limite=4, traduzir=None):
+        self._buscar = buscar
+        self._max_workers = max_workers
+        self._limite = limite
+        self._traduzir = traduzir
+        self._prontas = {}
+        self._vencidas = {}
+        self._estatisticas = {"cache": 0, "buscadas": 0, "falhas": 0}
+        self._lock = threading.Lock()
+        self._concluida = threading.Event()
+
+    def agendar(self, pares):
+        """Inicia a busca em segundo plano para os pares (ticker, empresa)."""
+
+        pendentes = []
+
+        # uma busca por empresa: as outras classes (PETR3/PETR4) usam a mesma
+        emissores = {}
+
+        for ticker, empresa in dict(pares).items():
+            emissores.setdefault(raiz_emissor(ticker), (ticker, empresa))
+
+        for raiz, (ticker, empresa) in emissores.items():
+
+            entrada = ler_cache(raiz)
+
+            if cache_valido(entrada):
+                self._prontas[raiz] = entrada["noticias"]
+                self._estatisticas["cache"] += 1
+            else:
+                if entrada:
+                    self._vencidas[raiz] = entrada.get("noticias", [])
+                pendentes.append((ticker, empresa))
+
+        threading.Thread(target=self._trabalhar, args=(pendentes,), daemon=True).start()
+
+    def _buscar_um(self, par):
+
+        ticker, empresa = par
+
+        try:
+            noticias = self._buscar(ticker, empresa, self._limite, self._traduzir)
+        except Exception as e:
+            logger.warning(f"[{ticker}] Erro na pré-busca de notícias: {e}")
+            with self._lock:
+                self._estatisticas["falhas"] += 1
+            return
+
+        salvar_cache(raiz_emissor(ticker), noticias)
+
+        with self._lock:
+            self._prontas[raiz_emissor(ticker)] = noticias
+            self._estatisticas["buscadas"] += 1
+
+    def _trabalhar(self, pendentes):
+
+        try:
+            with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+                list(executor.map(self._buscar_um, pendentes))
+        finally:
+            self._concluida.set()
+
+    def aguardar(self, prazo=None):
+        """Espera a etapa terminar por até `prazo` segundos; True se terminou."""
+
+        concluida = self._concluida.wait(prazo)
+
+        with self._lock:
+            valores = dict(self._estatisticas)
+            faltando = len(self._vencidas.keys() - self._prontas.keys())
+
+        mensagem = (
+            f"Notícias: {valores['cache']} do cache, {valores['buscadas']} buscadas, "
+            f"{valores['falhas']} falhas" + ("" if concluida else " (prazo esgotado, segue com o que há)")
+        )
+
+        print(mensagem)
+        logger.info(mensagem)
+
+        if faltando:
+            logger.info(f"Notícias: {faltando} empresas usando cache vencido")
+
+        return concluida
+
+    def obter(self, ticker):
+        """Notícias prontas do ticker, sem rede: atual, cache vencido ou lista vazia."""
+
+        raiz = raiz_emissor(ticker)
+
+        with self._lock:
+            if raiz in self._prontas:
+                return self._prontas[raiz]
+
+            return self._vencidas.get(raiz, [])
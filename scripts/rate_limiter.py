@@ -0,0 +1,268 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+
+from scripts.logger import logger
+from scripts import replay
+
+# =========================
+# CONTROLE DE TAXA POR HOST
+# =========================
+#
+# Toda chamada externa passa por executar(host, fn):
+#   - token bucket por host (taxa sustentada + rajada)
+#   - backoff exponencial com jitter em 429/5xx e erros de rede
+#   - disjuntor: depois de N falhas seguidas o host fica em pausa e as
+#     chamadas falham na hora, sem bater no servidor
+
+# host: (requisições por segundo, rajada)
+LIMITES = {
+    "yahoo": (5, 10),
+    "brapi": (2, 4),
+    "google_news": (3, 6),
+    "tradutor": (3, 5),
+    "github_logos": (10, 20),
+}
+
+LIMITE_PADRAO = (5, 10)
+
+TENTATIVAS = 4
+BACKOFF_BASE_S = 1.0
+BACKOFF_MAX_S = 30.0
+
+FALHAS_PARA_ABRIR = 5
+PAUSA_CIRCUITO_S = 60.0
+
+
+class ErroHttp(Exception):
+
+    def __init__(self, status, retry_after=None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+    def __reduce__(self):
+        return (ErroHttp, (self.status, self.retry_after))
+
+
+class CircuitoAberto(Exception):
+    pass
+
+
+class TokenBucket:
+
+    def __init__(self, taxa, capacidade):
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self.tokens = capacidade
+        self.ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consumir(self):
+
+        with self._lock:
+
+            agora = time.monotonic()
+            self.tokens = min(self.capacidade, self.tokens + (agora - self.ultimo) * self.taxa)
+            self.ultimo = agora
+
+            # reserva o token mesmo que falte: a espera fica fora do lock
+            self.tokens -= 1
+            espera = -self.tokens / self.taxa if self.tokens < 0 else 0
+
+        if espera > 0:
+            time.sleep(espera)
+
+
+class Disjuntor:
+
+    def __init__(self, host):
+        self.host = host
+        self.falhas = 0
+        self.aberto_ate = 0
+        self._lock = threading.Lock()
+
+    def permitir(self):
+        with self._lock:
+            return time.monotonic() >= self.aberto_ate
+
+    def sucesso(self):
+        with self._lock:
+            self.falhas = 0
+            self.aberto_ate = 0
+
+    def falha(self):
+
+        with self._lock:
+
+            self.falhas += 1
+
+            # após abrir, uma falha na sondagem já reabre o circuito
+            if self.falhas >= FALHAS_PARA_ABRIR:
+                self.aberto_ate = time.monotonic() + PAUSA_CIRCUITO_S
+                logger.warning(f"Circuito aberto para {self.host} por {PAUSA_CIRCUITO_S:.0f}s ({self.falhas} falhas seguidas)")
+
+
+_baldes = {}
+_disjuntores = {}
+_lock = threading.Lock()
+
+# medidores da thread atual, por host (ver medindo)
+_local = threading.local()
+
+
+def _estado(host):
+
+    with _lock:
+
+        if host not in _baldes:
+            _baldes[host] = TokenBucket(*LIMITES.get(host, LIMITE_PADRAO))
+            _disjuntores[host] = Disjuntor(host)
+
+        return _baldes[host], _disjuntores[host]
+
+
+def rajada(host):
+    """Quantas requisições ao host podem sair juntas sem esperar token."""
+
+    return LIMITES.get(host, LIMITE_PADRAO)[1]
+
+
+def verificar_status(response):
+    """Levanta ErroHttp para respostas que valem nova tentativa (429/5xx)."""
+
+    status = response.status_code
+
+    if status == 429 or status >= 500:
+        raise ErroHttp(status, response.headers.get("Retry-After"))
+
+    return response
+
+
+def _retentavel(erro):
+
+    if isinstance(erro, ErroHttp):
+        return True
+
+    if isinstance(erro, (requests.ConnectionError, requests.Timeout)):
+        return True
+
+    # yfinance sinaliza 429 com exceção própria
+    if "RateLimit" in type(erro).__name__ or "Too Many Requests" in str(erro):
+        return True
+
+    return False
+
+
+def falha_temporaria(erro):
+    """Erro que esgotou as tentativas ou veio de circuito aberto: o host falhou, não o dado."""
+    return isinstance(erro, CircuitoAberto) or _retentavel(erro)
+
+
+def _espera_backoff(tentativa, erro):
+
+    retry_after = getattr(erro, "retry_after", None)
+
+    try:
+        if retry_after:
+            return min(BACKOFF_MAX_S, float(retry_after))
+    except ValueError:
+        pass
+
+    return min(BACKOFF_MAX_S, BACKOFF_BASE_S * 2 ** tentativa) * random.uniform(0.5, 1)
+
+
+@contextmanager
+def medindo(host, ao_iniciar=None, ao_terminar=None):
+    """
+    Nas chamadas a `host` feitas pela thread atual dentro do bloco, avisa
+    ao_iniciar() quando a requisição sai (já com o token) e
+    ao_terminar(segundos) com a duração só dela, sem fila nem backoff.
+    """
+
+    medidores = getattr(_local, "medidores", {})
+    anterior = medidores.get(host)
+
+    medidores[host] = (ao_iniciar, ao_terminar)
+    _local.medidores = medidores
+
+    try:
+        yield
+    finally:
+        if anterior is None:
+            medidores.pop(host, None)
+        else:
+            medidores[host] = anterior
+
+
+def _chamar(host, fn, args, kwargs):
+
+    ao_iniciar, ao_terminar = getattr(_local, "medidores", {}).get(host, (None, None))
+
+    if ao_iniciar:
+        ao_iniciar()
+
+    inicio = time.monotonic()
+
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        if ao_terminar:
+            ao_terminar(time.monotonic() - inicio)
+
+
+def executar(host, fn, *args, chave=None, tentativas=TENTATIVAS, **kwargs):
+
+    # chave identifica a chamada no arquivo de gravação/reprodução
+    if chave is not None and replay.reproduzindo():
+        return replay.reproduzir(host, chave)
+
+    if chave is None or not replay.gravando():
+        return _executar_com_limite(host, fn, args, kwargs, tentativas)
+
+    try:
+        resultado = _executar_com_limite(host, fn, args, kwargs, tentativas)
+    except Exception as e:
+        replay.gravar(host, chave, erro=e)
+        raise
+
+    replay.gravar(host, chave, resultado)
+
+    return resultado
+
+
+def _executar_com_limite(host, fn, args, kwargs, tentativas):
+
+    balde, disjuntor = _estado(host)
+
+    for tentativa in range(tentativas):
+
+        if not disjuntor.permitir():
+            raise CircuitoAberto(host)
+
+        balde.consumir()
+
+        try:
+            resultado = _chamar(host, fn, args, kwargs)
+
+        except Exception as e:
+
+            # erro do dado (404, ticker inválido...) não é culpa do host
+            if not _retentavel(e):
+                raise
+
+            disjuntor.falha()
+
+            if tentativa == tentativas - 1:
+                raise
+
+            time.sleep(_espera_backoff(tentativa, e))
+
+            continue
+
+        disjuntor.sucesso()
+
+        return resultado
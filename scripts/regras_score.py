@@ -0,0 +1,245 @@
+# =========================
+# REGRAS DE SCORE EM ARQUIVO
+# =========================
+#
+# As faixas de value_score, score_qualidade, score_valuation, calcular_ranking
+# e calcular_risco descritas em JSON (data/regras_score.json reproduz as
+# funções de scripts/scoring.py bit a bit). O arquivo é compilado uma vez
+# em funções numpy sobre colunas inteiras e pode ser aplicado ao snapshot
+# mais recente de data/history, sem rede:
+#
+#   python -m scripts.regras_score
+#   python -m scripts.regras_score --regras minhas_regras.json --top 20
+#
+# Cada chave do JSON é uma coluna de saída, calculada na ordem do arquivo
+# (uma saída pode usar as anteriores):
+#
+#   "regras"    soma de pontos. {"se": [...], "pontos": n} soma n quando
+#               todas as condições valem; {"faixas": [...], "senao": 0}
+#               soma só a primeira faixa que valer (if/elif/else)
+#   "combinar"  soma ponderada de colunas: {"ScoreQualidade": 0.6, ...}
+#   "rotulos"   troca o total pelo rótulo da primeira faixa com total <= "ate";
+#               "senao" é o rótulo de quem passar de todas
+#
+# Condição: [coluna, operador, valor], com valor numérico ou nome de outra
+# coluna. Como nas funções por linha, NaN nunca satisfaz uma condição.
+
+import argparse
+import json
+import operator
+import time
+
+import numpy as np
+import pandas as pd
+
+from scripts.history_analysis import carregar_ultimo_snapshot
+
+REGRAS_ARQUIVO = "data/regras_score.json"
+
+OPERADORES = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+
+class RegrasCompiladas:
+
+    def __init__(self, saidas, colunas):
+        self.saidas = saidas      # [(coluna, função(obter) -> array)]
+        self.colunas = colunas    # colunas de entrada usadas
+
+    @property
+    def nomes(self):
+        return [nome for nome, _ in self.saidas]
+
+
+def _compilar_condicoes(condicoes, usadas):
+
+    testes = []
+
+    for condicao in condicoes:
+
+        try:
+            coluna, simbolo, valor = condicao
+        except (TypeError, ValueError):
+            raise ValueError(f"Condição inválida: {condicao!r} (use [coluna, operador, valor])")
+
+        if simbolo not in OPERADORES:
+            raise ValueError(f"Operador desconhecido: {simbolo} (opções: {' '.join(OPERADORES)})")
+
+        usadas.add(coluna)
+
+        if isinstance(valor, str):
+            usadas.add(valor)
+
+        testes.append((coluna, OPERADORES[simbolo], valor))
+
+    def avaliar(obter):
+
+        resultado = True
+
+        for coluna, op, valor in testes:
+            direita = obter(valor) if isinstance(valor, str) else valor
+            resultado = resultado & op(obter(coluna), direita)
+
+        return resultado
+
+    return avaliar
+
+
+def _compilar_regra(regra, usadas):
+
+    if "faixas" in regra:
+
+        faixas = [(_compilar_condicoes(f["se"], usadas), f["pontos"]) for f in regra["faixas"]]
+        senao = regra.get("senao", 0)
+
+        return lambda obter: np.select([cond(obter) for cond, _ in faixas], [p for _, p in faixas], default=senao)
+
+    cond = _compilar_condicoes(regra["se"], usadas)
+    pontos = regra["pontos"]
+
+    return lambda obter: np.where(cond(obter), pontos, 0)
+
+
+def _compilar_saida(nome, definicao, usadas):
+
+    termos = [_compilar_regra(r, usadas) for r in definicao.get("regras", [])]
+    pesos = list(definicao.get("combinar", {}).items())
+    rotulos = definicao.get("rotulos")
+    senao = definicao.get("senao")
+
+    if not termos and not pesos:
+        raise ValueError(f"Saída {nome} sem \"regras\" nem \"combinar\"")
+
+    usadas.update(coluna for coluna, _ in pesos)
+
+    def calcular(obter):
+
+        total = 0
+
+        for termo in termos:
+            total = total + termo(obter)
+
+        for coluna, peso in pesos:
+            total = total + obter(coluna) * peso
+
+        if rotulos:
+            total = np.select(
+                [total <= r["ate"] for r in rotulos],
+                [r["rotulo"] for r in rotulos],
+                default=senao
+            ).astype(object)
+
+        return total
+
+    return calcular
+
+
+def compilar_regras(config):
+    """Compila o dicionário de regras (formato do JSON) uma única vez."""
+
+    entradas = set()
+    saidas = []
+
+    for nome, definicao in config.items():
+
+        usadas = set()
+        saidas.append((nome, _compilar_saida(nome, definicao, usadas)))
+
+        # saídas anteriores já estão calculadas; o resto vem do DataFrame
+        entradas.update(usadas - {n for n, _ in saidas[:-1]})
+
+    return RegrasCompiladas(saidas, entradas)
+
+
+def carregar_regras(caminho=REGRAS_ARQUIVO):
+
+    with open(caminho, "r", encoding="utf-8") as f:
+        return compilar_regras(json.load(f))
+
+
+def aplicar_regras(df, regras):
+    """Cópia de df com as colunas de saída das regras calculadas coluna a coluna."""
+
+    faltando = sorted(regras.colunas - set(df.columns))
+
+    if faltando:
+        raise ValueError(f"Colunas ausentes para as regras: {', '.join(faltando)}")
+
+    entradas = {coluna: df[coluna].to_numpy() for coluna in regras.colunas}
+    calculadas = {}
+
+    def obter(coluna):
+        return calculadas[coluna] if coluna in calculadas else entradas[coluna]
+
+    for nome, calcular in regras.saidas:
+        calculadas[nome] = np.broadcast_to(calcular(obter), len(df))
+
+    df = df.copy()
+
+    for nome, valores in calculadas.items():
+        df[nome] = pd.Series(valores, index=df.index, dtype=valores.dtype)
+
+    return df
+
+
+# =========================
+# TESTE SOBRE O SNAPSHOT
+# =========================
+
+def comparar(df_antes, df_depois, nomes):
+    """Quantos tickers mudaram em cada saída que já existia no snapshot."""
+
+    mudancas = {}
+
+    for nome in nomes:
+
+        if nome not in df_antes.columns:
+            continue
+
+        antes = df_antes[nome]
+        depois = df_depois[nome]
+        iguais = (antes == depois) | (antes.isna() & depois.isna())
+
+        mudancas[nome] = int((~iguais).sum())
+
+    return mudancas
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Aplica um arquivo de regras ao snapshot mais recente.")
+    parser.add_argument("--regras", default=REGRAS_ARQUIVO, help="arquivo JSON de regras")
+    parser.add_argument("--snapshot", help="CSV de data/history (padrão: o mais recente)")
+    parser.add_argument("--ordenar", default="Score", help="coluna usada no top")
+    parser.add_argument("--top", type=int, default=10, help="quantas ações mostrar")
+
+    args = parser.parse_args()
+
+    if args.snapshot:
+        snapshot, caminho = pd.read_csv(args.snapshot), args.snapshot
+    else:
+        snapshot, caminho = carregar_ultimo_snapshot()
+
+    inicio = time.perf_counter()
+    regras = carregar_regras(args.regras)
+    t_compilar = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    resultado = aplicar_regras(snapshot, regras)
+    t_aplicar = time.perf_counter() - inicio
+
+    print(f"{caminho}: {len(snapshot)} ações")
+    print(f"Regras {args.regras}: compiladas em {t_compilar * 1000:.1f} ms, aplicadas em {t_aplicar * 1000:.1f} ms")
+
+    for nome, n in comparar(snapshot, resultado, regras.nomes).items():
+        print(f"  {nome}: {n} ações mudaram em relação ao snapshot")
+
+    colunas = ["Ticker"] + [n for n in regras.nomes if n != args.ordenar] + [args.ordenar]
+    print()
+    print(resultado.nlargest(args.top, args.ordenar)[colunas].to_string(index=False))
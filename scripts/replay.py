@@ -0,0 +1,110 @@
+import atexit
+import gzip
+import hashlib
+import os
+import pickle
+import threading
+
+from scripts.logger import logger
+
+# =========================
+# GRAVAÇÃO / REPRODUÇÃO DE RESPOSTAS EXTERNAS
+# =========================
+#
+# REPLAY_MODO=gravar     -> toda chamada feita via rate_limiter.executar(chave=...)
+#                           é guardada (resultado ou exceção) num arquivo gzip
+# REPLAY_MODO=reproduzir -> as mesmas chamadas são servidas do arquivo, sem rede
+#                           e sem rate limit, para medir o pipeline offline
+#
+# O arquivo é escrito uma vez, no fim do processo.
+
+MODO = os.environ.get("REPLAY_MODO", "")
+ARQUIVO = os.environ.get("REPLAY_ARQUIVO", "data/replay/execucao.pkl.gz")
+
+
+class ErroReplay(Exception):
+    pass
+
+
+_respostas = None
+_lock = threading.Lock()
+
+
+def gravando():
+    return MODO == "gravar"
+
+
+def reproduzindo():
+    return MODO == "reproduzir"
+
+
+def chave_texto(texto):
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+
+def _carregar():
+
+    global _respostas
+
+    if _respostas is not None:
+        return _respostas
+
+    _respostas = {}
+
+    if reproduzindo():
+
+        with gzip.open(ARQUIVO, "rb") as f:
+            _respostas = pickle.load(f)
+
+        print(f"Replay: {len(_respostas)} respostas carregadas de {ARQUIVO}")
+
+    return _respostas
+
+
+def salvar_arquivo():
+
+    with _lock:
+        respostas = dict(_respostas or {})
+
+    os.makedirs(os.path.dirname(ARQUIVO) or ".", exist_ok=True)
+
+    with gzip.open(ARQUIVO, "wb") as f:
+        pickle.dump(respostas, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    print(f"Replay: {len(respostas)} respostas gravadas em {ARQUIVO}")
+    logger.info(f"Replay: {len(respostas)} respostas gravadas em {ARQUIVO}")
+
+
+def gravar(host, chave, resultado=None, erro=None):
+
+    entrada = ("erro", erro) if erro is not None else ("ok", resultado)
+
+    # respostas que não serializam (objetos com conexões, locks...) ficam de fora
+    try:
+        pickle.loads(pickle.dumps(entrada))
+    except Exception:
+        logger.warning(f"Replay: resposta de {host} {chave} não serializável, ignorada")
+        return
+
+    with _lock:
+        _carregar()[(host, chave)] = entrada
+
+
+def reproduzir(host, chave):
+
+    with _lock:
+        entrada = _carregar().get((host, chave))
+
+    if entrada is None:
+        raise ErroReplay(f"sem resposta gravada para {host} {chave}")
+
+    tipo, valor = entrada
+
+    if tipo == "erro":
+        raise valor
+
+    return valor
+
+
+if gravando():
+    atexit.register(salvar_arquivo)
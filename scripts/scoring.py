@@ -1,3 +1,6 @@
+import numpy as np
+import pandas as pd
+
 # múltiplos razoáveis por setor
 SETOR_PL = {
 
@@ -215,6 +218,111 @@ def calcular_ranking(row):
 
     return ranking
 
+# =========================
+# VERSÕES VETORIZADAS
+# =========================
+#
+# As mesmas regras acima, coluna a coluna sobre o DataFrame inteiro em vez
+# de df.apply(fn, axis=1). Os resultados são idênticos bit a bit aos das
+# funções por linha (NaN compara como falso nos dois casos); o arredondamento
+# do desconto usa o round() do Python, pois o np.round pode divergir dele
+# no último dígito.
+
+def value_score_vetorizado(df):
+
+    score = (
+        ((df["PL"] > 0) & (df["PL"] < 10)) * 25
+        + ((df["PVP"] > 0) & (df["PVP"] < 1.5)) * 25
+        + (df["ROE"] > 0.15) * 20
+        + (df["DivYield"] > 0.05) * 15
+        + (df["MarketCap"] > 10_000_000_000) * 15
+    )
+
+    return score.astype("int64")
+
+
+def calcular_preco_justo_vetorizado(df):
+
+    preco = df["Preco"].to_numpy(dtype=float)
+    pl = df["PL"].to_numpy(dtype=float)
+    pvp = df["PVP"].to_numpy(dtype=float)
+    roe = df["ROE"].to_numpy(dtype=float)
+
+    pl_setor = df["Setor"].map(SETOR_PL).fillna(12).to_numpy(dtype=float)
+    pvp_setor = df["Setor"].map(SETOR_PVP).fillna(1.5).to_numpy(dtype=float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        preco_pl = np.where(pl > 0, preco * (pl_setor / pl), preco)
+        preco_pvp = np.where(pvp > 0, preco * (pvp_setor / pvp), preco)
+
+    fator_roe = 1 + (roe * 0.5)
+
+    preco_justo = ((preco_pl + preco_pvp) / 2) * fator_roe
+
+    preco_justo = np.where(preco_justo > preco * 3, preco * 3, preco_justo)
+    preco_justo = np.where(preco_justo < preco * 0.5, preco * 0.5, preco_justo)
+
+    preco_justo = np.where(preco <= 0, 0.0, preco_justo)
+
+    return pd.Series([round(p, 2) for p in preco_justo.tolist()], index=df.index, dtype=float)
+
+
+def calcular_desconto_vetorizado(df):
+
+    preco_justo = df["PrecoJusto"].to_numpy(dtype=float)
+    preco = df["Preco"].to_numpy(dtype=float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        desconto = (preco_justo - preco) / preco_justo * 100
+
+    desconto = np.where(preco_justo <= 0, 0.0, desconto)
+
+    return pd.Series([round(d, 2) for d in desconto.tolist()], index=df.index, dtype=float)
+
+
+def calcular_risco_vetorizado(df):
+
+    risco = (
+        (df["PL"] > 20).astype(int)
+        + (df["PVP"] > 2)
+        + (df["DivYield"] < 0.03)
+        + (df["ROE"] < 0.12)
+    )
+
+    rotulos = np.select([risco <= 1, risco <= 3], ["Baixo", "Médio"], default="Alto")
+
+    return pd.Series(rotulos, index=df.index, dtype=object)
+
+
+def score_qualidade_vetorizado(df):
+
+    score = (
+        np.select([df["ROE"] > 0.20, df["ROE"] > 0.15], [30, 20], default=0)
+        + np.select([df["DivYield"] > 0.06, df["DivYield"] > 0.03], [20, 10], default=0)
+        + np.select([df["PVP"] < 1, df["PVP"] < 1.5], [20, 10], default=0)
+        + np.where(df["MarketCap"] > 10_000_000_000, 10, 0)
+    )
+
+    return pd.Series(score, index=df.index, dtype="int64")
+
+
+def score_valuation_vetorizado(df):
+
+    desconto = df["Desconto_%"]
+
+    score = np.select(
+        [desconto > 50, desconto > 30, desconto > 15, desconto > 5],
+        [40, 30, 20, 10],
+        default=0
+    )
+
+    return pd.Series(score, index=df.index, dtype="int64")
+
+
+def calcular_ranking_vetorizado(df):
+    return score_qualidade_vetorizado(df) * 0.6 + score_valuation_vetorizado(df) * 0.4
+
+
 # =========================
 # Carregar histórico 
 # =========================
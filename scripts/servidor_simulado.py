@@ -0,0 +1,335 @@
+# =========================
+# SERVIDOR SIMULADO (brapi + Yahoo + Google News)
+# =========================
+#
+# Servidor HTTP local para testes de carga, sem depender das APIs reais.
+# Emula os endpoints usados pelo pipeline, com latência, taxa de erro e
+# tamanho de universo configuráveis:
+#
+#   python -m scripts.servidor_simulado --universo 5000 --latencia-ms 80 --taxa-erro 0.02
+#
+#   BRAPI_BASE_URL=http://127.0.0.1:8765 \
+#   YAHOO_BASE_URL=http://127.0.0.1:8765 \
+#   GOOGLE_NEWS_BASE_URL=http://127.0.0.1:8765 \
+#   python main.py
+#
+# Endpoints:
+#   /api/available                       lista de tickers (brapi)
+#   /api/quote/list?limit=&page=         cotações paginadas (brapi)
+#   /v7/finance/quote?symbols=           preço e market cap (Yahoo)
+#   /v10/finance/quoteSummary/<símbolo>  fundamentos e cadastro (Yahoo)
+#   /v8/finance/chart/<símbolo>          dividendos via events=div (Yahoo)
+#   /v1/finance/search?q=                notícias (Yahoo)
+#   /rss/search?q=                       notícias RSS (Google News, com ETag)
+
+import argparse
+import hashlib
+import json
+import random
+import string
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+SETORES = [
+    "Energy", "Basic Materials", "Financial Services", "Healthcare",
+    "Industrials", "Consumer Cyclical", "Consumer Defensive", "Utilities",
+    "Real Estate", "Communication Services", "Technology",
+]
+
+
+def gerar_universo(tamanho, semente=42):
+    """Empresas sintéticas determinísticas: mesma semente, mesmo universo."""
+
+    rng = random.Random(semente)
+
+    universo = {}
+    raizes = set()
+
+    while len(universo) < tamanho:
+
+        raiz = "".join(rng.choice(string.ascii_uppercase) for _ in range(4))
+
+        if raiz in raizes:
+            continue
+
+        raizes.add(raiz)
+
+        setor = rng.choice(SETORES)
+        lucro_por_acao = rng.uniform(0.2, 8)
+        valor_patrimonial = rng.uniform(2, 40)
+        acoes = rng.uniform(5e7, 5e9)
+
+        # parte das empresas tem duas classes (ON/PN)
+        classes = ["3", "4"] if rng.random() < 0.3 else [rng.choice("3456")]
+
+        for classe in classes:
+
+            if len(universo) >= tamanho:
+                break
+
+            preco = round(rng.uniform(1, 120), 2)
+
+            universo[f"{raiz}{classe}"] = {
+                "nome": f"{raiz.title()} SA {'ON' if classe == '3' else 'PN'}",
+                "setor": setor,
+                "preco": preco,
+                "market_cap": preco * acoes,
+                "pl": round(preco / lucro_por_acao, 2),
+                "pvp": round(preco / valor_patrimonial, 2),
+                "roe": round(rng.uniform(-0.05, 0.35), 4),
+                "dy": round(rng.uniform(0, 0.14), 4),
+                "dividendos": [
+                    (int(time.time()) - dias * 86400, round(rng.uniform(0.05, 1.5), 4))
+                    for dias in sorted(rng.sample(range(10, 1800), rng.randint(0, 20)))
+                ],
+            }
+
+    return universo
+
+
+def _raw(valor):
+    return {"raw": valor, "fmt": str(valor)}
+
+
+class Simulador(BaseHTTPRequestHandler):
+
+    universo = {}
+    latencia_ms = 0
+    jitter_ms = 0
+    taxa_erro = 0.0
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _responder(self, status, corpo, tipo="application/json", cabecalhos=None):
+
+        dados = corpo.encode("utf-8") if isinstance(corpo, str) else corpo
+
+        self.send_response(status)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(dados)))
+
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _json(self, dados, status=200):
+        self._responder(status, json.dumps(dados))
+
+    def do_GET(self):
+
+        atraso = self.latencia_ms + random.uniform(0, self.jitter_ms)
+        time.sleep(atraso / 1000)
+
+        if random.random() < self.taxa_erro:
+            return self._json({"error": "erro simulado"}, random.choice([429, 500, 503]))
+
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        caminho = url.path
+
+        if caminho == "/api/available":
+            return self._json({"indexes": [], "stocks": sorted(self.universo)})
+
+        if caminho == "/api/quote/list":
+            return self._quote_list(params)
+
+        if caminho == "/v7/finance/quote":
+            return self._quote(params)
+
+        if caminho.startswith("/v10/finance/quoteSummary/"):
+            return self._quote_summary(caminho.rsplit("/", 1)[-1])
+
+        if caminho.startswith("/v8/finance/chart/"):
+            return self._chart(caminho.rsplit("/", 1)[-1], params)
+
+        if caminho == "/v1/finance/search":
+            return self._busca(params)
+
+        if caminho == "/rss/search":
+            return self._rss(params)
+
+        return self._json({"error": "não encontrado"}, 404)
+
+    def _empresa(self, simbolo):
+        return self.universo.get(simbolo.replace(".SA", ""))
+
+    def _quote_list(self, params):
+
+        limite = int(params.get("limit", 100))
+        pagina = int(params.get("page", 1))
+
+        tickers = sorted(self.universo)
+        total_paginas = max(1, -(-len(tickers) // limite))
+        fatia = tickers[(pagina - 1) * limite:pagina * limite]
+
+        return self._json({
+            "stocks": [
+                {
+                    "stock": t,
+                    "name": self.universo[t]["nome"],
+                    "close": self.universo[t]["preco"],
+                    "market_cap": self.universo[t]["market_cap"],
+                    "sector": self.universo[t]["setor"],
+                    "type": "stock",
+                }
+                for t in fatia
+            ],
+            "currentPage": pagina,
+            "totalPages": total_paginas,
+            "hasNextPage": pagina < total_paginas,
+        })
+
+    def _quote(self, params):
+
+        resultado = []
+
+        for simbolo in params.get("symbols", "").split(","):
+
+            empresa = self._empresa(simbolo)
+
+            if empresa:
+                resultado.append({
+                    "symbol": simbolo,
+                    "regularMarketPrice": empresa["preco"],
+                    "marketCap": empresa["market_cap"],
+                })
+
+        return self._json({"quoteResponse": {"result": resultado, "error": None}})
+
+    def _quote_summary(self, simbolo):
+
+        empresa = self._empresa(simbolo)
+
+        if not empresa:
+            return self._json({"quoteSummary": {"result": None, "error": {"code": "Not Found"}}}, 404)
+
+        return self._json({"quoteSummary": {"result": [{
+            "price": {
+                "shortName": empresa["nome"],
+                "marketCap": _raw(empresa["market_cap"]),
+                "regularMarketPrice": _raw(empresa["preco"]),
+            },
+            "summaryDetail": {
+                "trailingPE": _raw(empresa["pl"]),
+                "dividendYield": _raw(empresa["dy"]),
+            },
+            "defaultKeyStatistics": {
+                "priceToBook": _raw(empresa["pvp"]),
+            },
+            "financialData": {
+                "returnOnEquity": _raw(empresa["roe"]),
+            },
+            "assetProfile": {
+                "sector": empresa["setor"],
+                "website": f"https://www.{simbolo[:4].lower()}.com.br",
+                "longBusinessSummary": f"{empresa['nome']} is a company operating in the {empresa['setor']} sector in Brazil.",
+            },
+        }], "error": None}})
+
+    def _chart(self, simbolo, params):
+
+        empresa = self._empresa(simbolo)
+
+        # period1: só eventos a partir desse timestamp, como no Yahoo
+        inicio = int(params.get("period1", 0))
+
+        if not empresa:
+            return self._json({"chart": {"result": None, "error": {"code": "Not Found"}}}, 404)
+
+        return self._json({"chart": {"result": [{
+            "meta": {"symbol": simbolo, "regularMarketPrice": empresa["preco"], "currency": "BRL"},
+            "timestamp": [int(time.time())],
+            "events": {
+                "dividends": {
+                    str(ts): {"amount": valor, "date": ts}
+                    for ts, valor in empresa["dividendos"]
+                    if ts >= inicio
+                }
+            },
+        }], "error": None}})
+
+    def _busca(self, params):
+
+        simbolo = params.get("q", "")
+        quantidade = int(params.get("newsCount", 4))
+
+        return self._json({"news": [
+            {
+                "title": f"{simbolo} news headline {i + 1}",
+                "publisher": "Simulador",
+                "link": f"https://example.com/{simbolo}/{i + 1}",
+                "providerPublishTime": int(time.time()) - i * 3600,
+            }
+            for i in range(quantidade)
+        ]})
+
+    def _rss(self, params):
+
+        consulta = escape(params.get("q", ""))
+
+        # feed muda uma vez por hora, como um feed real entre publicações
+        hora = time.time() // 3600 * 3600
+
+        itens = "".join(
+            f"""<item>
+<title>{consulta} — notícia {i + 1}</title>
+<link>https://example.com/noticia/{i + 1}</link>
+<description>Resumo simulado da notícia {i + 1} sobre {consulta}.</description>
+<pubDate>{formatdate(hora - i * 3600, usegmt=True)}</pubDate>
+<source url="https://example.com">Simulador</source>
+</item>"""
+            for i in range(10)
+        )
+
+        rss = f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Google News simulado</title>{itens}</channel></rss>"""
+
+        etag = f'"{hashlib.sha1(rss.encode("utf-8")).hexdigest()[:16]}"'
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        return self._responder(200, rss, "application/rss+xml; charset=utf-8", {"ETag": etag})
+
+
+def iniciar_servidor(porta=8765, universo=700, latencia_ms=50, jitter_ms=30, taxa_erro=0.0, semente=42):
+
+    Simulador.universo = gerar_universo(universo, semente)
+    Simulador.latencia_ms = latencia_ms
+    Simulador.jitter_ms = jitter_ms
+    Simulador.taxa_erro = taxa_erro
+
+    return ThreadingHTTPServer(("127.0.0.1", porta), Simulador)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Servidor local que simula brapi, Yahoo e Google News.")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--universo", type=int, default=700, help="quantidade de tickers sintéticos")
+    parser.add_argument("--latencia-ms", type=float, default=50)
+    parser.add_argument("--jitter-ms", type=float, default=30)
+    parser.add_argument("--taxa-erro", type=float, default=0.0, help="fração de respostas 429/5xx (0 a 1)")
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    servidor = iniciar_servidor(args.porta, args.universo, args.latencia_ms, args.jitter_ms, args.taxa_erro, args.semente)
+
+    print(f"Servidor simulado em http://127.0.0.1:{args.porta} com {len(Simulador.universo)} tickers")
+
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,130 @@
+import datetime
+import hashlib
+import json
+import os
+import threading
+
+from scripts.logger import logger
+
+# =========================
+# CACHE DE TRADUÇÕES
+# =========================
+#
+# Memória persistente de traduções, endereçada pelo conteúdo: a chave é o
+# hash do texto original + idioma de destino. Resumo que não mudou não volta
+# ao tradutor; resumo editado na fonte gera hash novo e é traduzido de novo.
+# Entradas sem uso há DIAS_RETENCAO dias são descartadas ao salvar.
+
+ARQUIVO = "data/cache/traducoes.json"
+
+DIAS_RETENCAO = 90
+
+_traducoes = None
+_alterado = False
+_estatisticas = {"hits": 0, "misses": 0}
+_lock = threading.Lock()
+
+
+def chave_traducao(texto, destino="pt"):
+    return hashlib.sha256(f"{destino}\0{texto}".encode("utf-8")).hexdigest()
+
+
+def _carregar():
+
+    global _traducoes
+
+    if _traducoes is None:
+        try:
+            with open(ARQUIVO, "r", encoding="utf-8") as f:
+                _traducoes = json.load(f)
+        except Exception:
+            _traducoes = {}
+
+    return _traducoes
+
+
+def obter_traducao(texto, destino="pt"):
+    """Tradução guardada para o texto, ou None. Conta hit/miss."""
+
+    global _alterado
+
+    hoje = datetime.date.today().isoformat()
+
+    with _lock:
+
+        entrada = _carregar().get(chave_traducao(texto, destino))
+
+        if entrada is None:
+            _estatisticas["misses"] += 1
+            return None
+
+        _estatisticas["hits"] += 1
+
+        if entrada.get("usado") != hoje:
+            entrada["usado"] = hoje
+            _alterado = True
+
+        return entrada["texto"]
+
+
+def guardar_traducao(texto, traducao, destino="pt"):
+
+    global _alterado
+
+    if not traducao:
+        return
+
+    with _lock:
+        _carregar()[chave_traducao(texto, destino)] = {
+            "texto": traducao,
+            "usado": datetime.date.today().isoformat(),
+        }
+        _alterado = True
+
+
+def salvar_traducoes():
+
+    global _alterado
+
+    limite = (datetime.date.today() - datetime.timedelta(days=DIAS_RETENCAO)).isoformat()
+
+    with _lock:
+
+        if not _alterado:
+            return
+
+        traducoes = {
+            chave: entrada
+            for chave, entrada in _carregar().items()
+            if entrada.get("usado", "") >= limite
+        }
+
+        _alterado = False
+
+    os.makedirs(os.path.dirname(ARQUIVO), exist_ok=True)
+
+    temporario = f"{ARQUIVO}.tmp"
+
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(traducoes, f, ensure_ascii=False)
+
+    os.replace(temporario, ARQUIVO)
+
+
+def estatisticas_traducao():
+
+    with _lock:
+        return dict(_estatisticas)
+
+
+def registrar_estatisticas():
+
+    valores = estatisticas_traducao()
+
+    total = valores["hits"] + valores["misses"]
+    taxa = valores["hits"] / total * 100 if total else 0
+
+    mensagem = f"Cache de traduções: {valores['hits']} hits, {valores['misses']} misses ({taxa:.0f}% hit)"
+
+    print(mensagem)
+    logger.info(mensagem)
@@ -0,0 +1,294 @@
+import json
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from deep_translator import GoogleTranslator
+
+from scripts.logger import logger
+from scripts.rate_limiter import executar
+from scripts.replay import chave_texto
+from scripts.translation_cache import obter_traducao, guardar_traducao
+
+# =========================
+# TRADUÇÃO EM LOTE
+# =========================
+#
+# Junta os textos pendentes da execução em poucas requisições: cada lote
+# vai ao tradutor como um texto só, com marcadores numerados entre os
+# pedaços, e volta separado pelos mesmos marcadores. Se o tradutor
+# estragar algum marcador, o lote cai para uma chamada por texto.
+
+# o Google Translate web aceita até 5000 caracteres por chamada
+LIMITE_CARACTERES = 4500
+
+_MARCADOR = re.compile(r"@@\s*(\d+)\s*@@")
+
+
+def traduzir_google(texto, destino="pt"):
+    # instância nova por chamada: o GoogleTranslator guarda estado da requisição
+    return executar(
+        "tradutor",
+        GoogleTranslator(source='auto', target=destino).translate,
+        texto,
+        chave=chave_texto(texto)
+    )
+
+
+def _juntar(lote):
+    return "\n\n".join(f"@@{i}@@\n{texto}" for i, texto in enumerate(lote))
+
+
+def _separar(traduzido, quantidade):
+
+    partes = _MARCADOR.split(traduzido or "")
+
+    # split com grupo: ["", "0", texto0, "1", texto1, ...]
+    pedacos = {}
+
+    for i in range(1, len(partes) - 1, 2):
+        pedacos[int(partes[i])] = partes[i + 1].strip()
+
+    if sorted(pedacos) != list(range(quantidade)) or not all(pedacos.values()):
+        return None
+
+    return [pedacos[i] for i in range(quantidade)]
+
+
+def _montar_lotes(textos, limite):
+
+    lotes = []
+    atual = []
+    tamanho = 0
+
+    for texto in textos:
+
+        # texto + marcador "@@nn@@" e quebras de linha
+        custo = len(texto) + 10
+
+        if atual and tamanho + custo > limite:
+            lotes.append(atual)
+            atual = []
+            tamanho = 0
+
+        atual.append(texto)
+        tamanho += custo
+
+    if atual:
+        lotes.append(atual)
+
+    return lotes
+
+
+def _traduzir_um(texto, traduzir):
+    try:
+        return traduzir(texto)
+    except Exception:
+        return None
+
+
+def _traduzir_lote(lote, traduzir):
+
+    if len(lote) == 1:
+        return [_traduzir_um(lote[0], traduzir)], 1
+
+    try:
+        traducoes = _separar(traduzir(_juntar(lote)), len(lote))
+    except Exception:
+        traducoes = None
+
+    if traducoes is not None:
+        return traducoes, 1
+
+    # marcadores perdidos na tradução: uma chamada por texto
+    return [_traduzir_um(texto, traduzir) for texto in lote], 1 + len(lote)
+
+
+def traduzir_em_lote(textos, traduzir=traduzir_google, limite=LIMITE_CARACTERES, paralelo=1, destino="pt",
+                     consultar_cache=True, ao_traduzir=None):
+    """
+    Traduz vários textos no menor número de requisições possível.
+    Retorna {texto original: tradução}; texto que falhou fica fora do
+    dicionário, e quem pediu mantém o original. ao_traduzir(original,
+    tradução) é chamado assim que cada lote volta.
+    """
+
+    unicos = list(dict.fromkeys(t for t in textos if t))
+
+    resultado = {}
+    pendentes = []
+
+    for texto in unicos:
+
+        traducao = obter_traducao(texto, destino) if consultar_cache else None
+
+        if traducao is not None:
+            resultado[texto] = traducao
+        else:
+            pendentes.append(texto)
+
+    if not pendentes:
+        return resultado
+
+    lotes = _montar_lotes(pendentes, limite)
+    requisicoes = 0
+
+    with ThreadPoolExecutor(max_workers=paralelo) as executor:
+
+        # na ordem em que os lotes voltam: um lote lento não segura os outros
+        futuros = {executor.submit(_traduzir_lote, lote, traduzir): lote for lote in lotes}
+
+        for futuro in as_completed(futuros):
+
+            lote = futuros[futuro]
+            traducoes, chamadas = futuro.result()
+
+            requisicoes += chamadas
+
+            for original, traducao in zip(lote, traducoes):
+
+                if traducao:
+                    resultado[original] = traducao
+                    guardar_traducao(original, traducao, destino)
+
+                    if ao_traduzir:
+                        ao_traduzir(original, traducao)
+
+    logger.info(f"Tradução em lote: {len(pendentes)} textos novos em {requisicoes} requisições")
+
+    return resultado
+
+
+# =========================
+# ETAPA DE TRADUÇÃO EM SEGUNDO PLANO
+# =========================
+#
+# A tradução roda numa thread própria enquanto o resto do pipeline segue
+# (filtros, score, logos...). Quem precisa do texto espera no máximo um
+# prazo e usa o que estiver pronto: tradução nova, cache ou o original.
+# O que não ficou pronto a tempo é anotado e entra primeiro na fila da
+# próxima execução; o que terminar depois do prazo ainda vai para o cache.
+
+ARQUIVO_PENDENTES = "data/cache/traducoes_pendentes.json"
+
+
+def _carregar_pendentes():
+    try:
+        with open(ARQUIVO_PENDENTES, "r", encoding="utf-8") as f:
+            return set(json.load(f).get("textos", []))
+    except Exception:
+        return set()
+
+
+class EtapaTraducao:
+
+    def __init__(self, traduzir=traduzir_google, paralelo=4, destino="pt"):
+        self._traduzir = traduzir
+        self._paralelo = paralelo
+        self._destino = destino
+        self._fila = queue.Queue()
+        self._prontas = {}
+        self._pendentes = set()
+        self._atrasados = _carregar_pendentes()
+        self._cond = threading.Condition()
+
+        threading.Thread(target=self._trabalhar, daemon=True).start()
+
+    def agendar(self, textos):
+
+        novos = []
+
+        with self._cond:
+
+            for texto in dict.fromkeys(t for t in textos if t):
+
+                if texto in self._prontas or texto in self._pendentes:
+                    continue
+
+                traducao = obter_traducao(texto, self._destino)
+
+                if traducao is not None:
+                    self._prontas[texto] = traducao
+                else:
+                    self._pendentes.add(texto)
+                    novos.append(texto)
+
+        # atrasados da execução anterior vão na frente
+        novos.sort(key=lambda t: t not in self._atrasados)
+
+        if novos:
+            self._fila.put(novos)
+
+    def _trabalhar(self):
+
+        while True:
+
+            textos = self._fila.get()
+
+            # junta o que mais chegou enquanto isso, para lotes mais cheios
+            while True:
+                try:
+                    textos += self._fila.get_nowait()
+                except queue.Empty:
+                    break
+
+            try:
+                traduzir_em_lote(
+                    textos,
+                    self._traduzir,
+                    paralelo=self._paralelo,
+                    destino=self._destino,
+                    consultar_cache=False,
+                    ao_traduzir=self._concluir
+                )
+            except Exception as e:
+                logger.warning(f"Etapa de tradução: falha em lote de {len(textos)} textos: {e}")
+
+            # falhas também saem das pendentes: quem pediu fica com o original
+            with self._cond:
+                self._pendentes.difference_update(textos)
+                self._cond.notify_all()
+
+    def _concluir(self, original, traducao):
+        with self._cond:
+            self._prontas[original] = traducao
+            self._pendentes.discard(original)
+            self._cond.notify_all()
+
+    def aguardar(self, textos=None, prazo=None):
+        """Espera até `prazo` segundos pelas traduções e devolve {original: tradução} do que ficou pronto."""
+
+        limite = time.monotonic() + prazo if prazo is not None else None
+
+        with self._cond:
+
+            while self._pendentes if textos is None else self._pendentes.intersection(textos):
+
+                restante = None if limite is None else limite - time.monotonic()
+
+                if restante is not None and restante <= 0:
+                    break
+
+                self._cond.wait(restante)
+
+            return dict(self._prontas)
+
+    def traduzir(self, textos, prazo):
+        self.agendar(textos)
+        return self.aguardar(textos, prazo)
+
+    def salvar_pendentes(self):
+
+        with self._cond:
+            pendentes = sorted(self._pendentes)
+
+        os.makedirs(os.path.dirname(ARQUIVO_PENDENTES), exist_ok=True)
+
+        with open(ARQUIVO_PENDENTES, "w", encoding="utf-8") as f:
+            json.dump({"textos": pendentes}, f, ensure_ascii=False)
+
+        if pendentes:
+            logger.info(f"Etapa de tradução: {len(pendentes)} textos sem tradução no prazo, priorizados na próxima execução")
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+from scripts.scoring import calcular_preco_justo_vetorizado
+
+# =========================
+# MODELOS DE PREÇO JUSTO
+# =========================
+#
+# Calcula todos os modelos de uma vez, coluna a coluna, e deixa cada um
+# numa coluna própria (páginas e ranking.csv mostram todos). O modelo da
+# execução só decide qual deles vira o PrecoJusto usado no desconto,
+# no score de valuation e nos textos.
+#
+#   pl15      LPA x 15 (modelo original do site)
+#   setorial  P/L e P/VP de referência do setor, ajustados pelo ROE
+#             (mesma regra de scoring.calcular_preco_justo)
+#   graham    raiz de 22,5 x LPA x VPA; zero quando LPA ou VPA <= 0
+
+MODELOS = {
+    "pl15": {
+        "coluna": "PrecoJusto_PL15",
+        "descricao": "P/L conservador de 15x",
+    },
+    "setorial": {
+        "coluna": "PrecoJusto_Setorial",
+        "descricao": "múltiplos de referência do setor ajustados pelo ROE",
+    },
+    "graham": {
+        "coluna": "PrecoJusto_Graham",
+        "descricao": "fórmula de Graham (√22,5 × LPA × VPA)",
+    },
+}
+
+MODELO_PADRAO = "pl15"
+
+
+def calcular_precos_justos(df):
+    """DataFrame com LPA, VPA e uma coluna de preço justo por modelo, no índice de df."""
+
+    preco = df["Preco"].to_numpy(dtype=float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lpa = preco / df["PL"].to_numpy(dtype=float)
+        vpa = preco / df["PVP"].to_numpy(dtype=float)
+        graham = np.sqrt(22.5 * lpa * vpa)
+
+    graham = np.where((lpa > 0) & (vpa > 0), graham, 0.0)
+
+    return pd.DataFrame({
+        "LucroPorAcao": lpa,
+        "ValorPatrimonialPorAcao": vpa,
+        "PrecoJusto_PL15": lpa * 15,
+        "PrecoJusto_Setorial": calcular_preco_justo_vetorizado(df).to_numpy(),
+        "PrecoJusto_Graham": graham,
+    }, index=df.index)
+
+
+def aplicar_modelo(df, modelo=MODELO_PADRAO):
+    """Acrescenta as colunas de todos os modelos e define PrecoJusto pelo modelo escolhido."""
+
+    if modelo not in MODELOS:
+        raise ValueError(f"Modelo de preço justo desconhecido: {modelo} (opções: {', '.join(MODELOS)})")
+
+    precos = calcular_precos_justos(df)
+
+    df = df.copy()
+    df[precos.columns] = precos
+    df["PrecoJusto"] = df[MODELOS[modelo]["coluna"]]
+    df["ModeloPrecoJusto"] = modelo
+
+    return df